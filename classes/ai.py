@@ -1,145 +1,414 @@
 import random
-from .constants import ROWS, COLS, PIECE_LIGHT, PIECE_DARK
+import time
+from .rules import DARK, square_of, side_of, iter_bits
+from .tt import TranspositionTable, EXACT, LOWER, UPPER
+from .book import BOOK_PATH, load_book
+from .tablebase import TABLEBASE_DIR, WIN, LOSS, load_tablebase
+from .stats import SearchStats
+
+# Seconds a move may take at each difficulty, and how many more moves the
+# remaining clock has to last; the smaller of the two budgets wins
+TIME_ALLOCATION = {1: 0.5, 2: 2.0, 3: 5.0}
+MOVES_TO_GO = 20
+# The clock is read once every this many nodes (a power of two minus one)
+CLOCK_CHECK = 1023
+# Score of a tablebase win, less the distance in plies so shorter wins score higher
+TABLEBASE_WIN = 10000
+# Nodes the quiescence search below one leaf may visit before taking the static score
+QUIESCENCE_NODES = 64
+# Quiet moves that caused a beta cutoff kept per depth for their siblings
+KILLER_SLOTS = 2
+# "alphabeta" searches every move with the full window; "pvs" searches the
+# moves after the first with a null window and starts each iteration with an
+# aspiration window of ASPIRATION_WINDOW around the previous score
+SEARCH_MODES = ("alphabeta", "pvs")
+ASPIRATION_WINDOW = 10
+
+
+class SearchTimeout(Exception):
+    """Raised inside minimax when the deadline of the current search has passed"""
+
 
 class AIPlayer:
-    def __init__(self, color, difficulty="medium"):
+    def __init__(self, color, difficulty="medium", tt_megabytes=16, tt_policy="depth", book_path=BOOK_PATH,
+                 tablebase_dir=TABLEBASE_DIR):
         self.color = color
+        self.side = side_of(color)
         difficulty_map = {"easy": 1, "medium": 2, "hard": 3}
         self.difficulty = difficulty_map.get(difficulty, 2)
-        self.depth = {1: 3, 2: 5, 3: 7}[self.difficulty]
-
-    def evaluate_board(self, board):
-        score = 0
-        capture_opportunities = 0
-        opponent_color = PIECE_LIGHT if self.color == PIECE_DARK else PIECE_DARK
-
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = board.get_piece(row, col)
-                if piece == 0:
-                    continue
-
-                mod = 1 if piece.color == self.color else -1
-                score += mod * 10
-                if piece.king:
-                    score += mod * 30
-
-                # Positional bonuses
-                if row in (3, 4) and col in (3, 4):
-                    score += mod * 5
-                if col in (0, 7):
-                    score += mod * 3
-                if (piece.color == PIECE_DARK and row == 0) or (piece.color == PIECE_LIGHT and row == 7):
-                    score += mod * 10
-
-                if piece.color == self.color:
-                    moves = board.get_valid_moves(piece)
-                    for skipped in moves.values():
-                        if skipped:
-                            capture_opportunities += len(skipped) * 15
-
-        score += capture_opportunities
-        return score
-
-    def get_all_moves(self, game, color=None):
-        color = color or self.color
-        valid_moves = []
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = game.board.get_piece(row, col)
-                if piece != 0 and piece.color == color:
-                    moves = game.board.get_valid_moves(piece)
-                    for move, skipped in moves.items():
-                        valid_moves.append(((row, col), move, skipped))
-        valid_moves.sort(key=lambda x: len(x[2]), reverse=True)
-        return valid_moves
-
-    def simulate_move(self, game, piece_pos, move, skipped):
-        piece = game.board.get_piece(*piece_pos)
-        original_row, original_col = piece.row, piece.col
-        was_king = piece.king
-
-        game.board.move(piece, *move)
-        if skipped:
-            game.board.remove(skipped)
-
-        # Handle promotion
-        if move[0] == 0 or move[0] == ROWS - 1:
-            piece.make_king()
-            if piece.color == PIECE_LIGHT:
-                game.board.red_kings += 1
-            else:
-                game.board.white_kings += 1
+        # One ply less than before quiescence: in self-play 6 plies with it
+        # beat 7 without it at less than half the time per move
+        self.depth = {1: 2, 2: 4, 3: 6}[self.difficulty]
+        self.nodes = 0
+        self.deadline = None
+        # Optional callable polled with the clock; returning True aborts the search
+        self.should_stop = None
+        # Best move per position along the principal variation of the last iteration
+        self.pv_moves = {}
+        self.last_search = None
+        # tt_megabytes=0 searches without a transposition table
+        self.tt = TranspositionTable(tt_megabytes, tt_policy) if tt_megabytes else None
+        # book_path=None plays without an opening book
+        self.book = load_book(book_path) if book_path else None
+        # tablebase_dir=None searches endgames without the tablebase
+        self.tablebase = load_tablebase(tablebase_dir) if tablebase_dir else None
+        # Depth of the iteration being searched; the root is never answered
+        # from the tablebase since it has to return a move
+        self.root_depth = None
+        # With collect_stats each search fills a SearchStats, found in
+        # last_search["stats"] afterwards
+        self.collect_stats = False
+        self.stats = None
+        # Leaves play out pending captures in quiescence; without it they are
+        # scored as they stand, like the original search
+        self.quiescence = True
+        self.qnodes_left = 0
+        # Quiet moves are ordered by killer moves and history scores; without
+        # them they keep the generator's board order, like the original search
+        self.heuristics = True
+        # Depth -> killer moves of the current iteration, and quiet move ->
+        # history score (the sum of depth squared over its cutoffs this search)
+        self.killers = {}
+        self.history = {}
+        self.search_mode = "pvs"
 
-        return piece, (original_row, original_col), was_king, skipped
+    def evaluate_board(self, position):
+        """
+        Static score of ``position`` from the AI's point of view: material and
+        squares (kept incrementally as ``position.score``, see SQUARE_SCORES)
+        plus 15 per piece the AI could capture right now.
+        """
+        side = self.side
+        score = position.score if side == DARK else -position.score
+        capture_opportunities = position.captured_total(side) * 15
+        return score + capture_opportunities
 
-    def undo_move(self, game, piece, old_pos, was_king, skipped):
-        game.board.move(piece, *old_pos)
-        if not was_king:
-            piece.king = False
-            if piece.color == PIECE_LIGHT:
-                game.board.red_kings -= 1
-            else:
-                game.board.white_kings -= 1
-
-        if skipped:
-            for s in skipped:
-                game.board.board[s.row][s.col] = s
-                if s.color == PIECE_LIGHT:
-                    game.board.red_left += 1
-                else:
-                    game.board.white_left += 1
-
-    def minimax(self, game, depth, alpha, beta, maximizing):
-        if depth == 0 or game.winner() is not None:
-            return self.evaluate_board(game.board), None
-
-        color = self.color if maximizing else (PIECE_LIGHT if self.color == PIECE_DARK else PIECE_DARK)
-        valid_moves = self.get_all_moves(game, color)
+    def get_all_moves(self, position):
+        return position.moves()
+
+    def minimax(self, position, depth, alpha, beta):
+        """
+        Alpha-beta search in negamax form: scores are from the point of view of
+        the side to move in ``position``.
+        """
+        self.nodes += 1
+        if not self.nodes & CLOCK_CHECK and self._out_of_time():
+            raise SearchTimeout
+        stats = self.stats
+        if stats is not None and self.root_depth is not None:
+            stats.max_depth = max(stats.max_depth, self.root_depth - depth)
+        tablebase = self.tablebase
+        if (tablebase is not None and depth != self.root_depth
+                and (position.pieces[0] | position.pieces[1]).bit_count() <= tablebase.pieces):
+            entry = tablebase.probe(position)
+            if entry is not None:
+                if stats is not None:
+                    stats.leaves += 1
+                    stats.tablebase_hits += 1
+                return self._tablebase_score(*entry), None
+        if depth == 0 and self.quiescence:
+            if stats is not None:
+                stats.leaves += 1
+            self.qnodes_left = QUIESCENCE_NODES
+            return self.quiesce(position, alpha, beta, 1), None
+        if depth == 0 or position.winner() is not None:
+            if stats is not None:
+                stats.leaves += 1
+                return stats.evaluate(self._evaluate, position), None
+            return self._evaluate(position), None
+
+        tt = self.tt
+        tt_move = None
+        original_alpha = alpha
+        if tt is not None:
+            entry = tt.probe(position.hash)
+            if stats is not None:
+                stats.tt_probes += 1
+                stats.tt_hits += entry is not None
+            if entry is not None:
+                tt_depth, tt_score, tt_bound, tt_move = entry
+                if tt_depth >= depth:
+                    if tt_bound == EXACT:
+                        return tt_score, tt_move
+                    if tt_bound == LOWER and tt_score >= beta:
+                        return tt_score, tt_move
+                    if tt_bound == UPPER and tt_score <= alpha:
+                        return tt_score, tt_move
+
+        valid_moves = position.moves() if stats is None else stats.moves(position)
         if not valid_moves:
-            return self.evaluate_board(game.board), None
+            if stats is not None:
+                stats.leaves += 1
+                return stats.evaluate(self._evaluate, position), None
+            return self._evaluate(position), None
+        if self.heuristics:
+            self.order_moves(valid_moves, depth)
+        # Search the previous iteration's PV move first, then the stored best move
+        for first in (tt_move, self.pv_moves.get(position.hash)):
+            if first is not None and first in valid_moves:
+                valid_moves.remove(first)
+                valid_moves.insert(0, first)
 
+        pvs = self.search_mode == "pvs"
+        best_score = float('-inf')
         best_move = None
-        if maximizing:
-            max_eval = float('-inf')
-            for piece_pos, move, skipped in valid_moves:
-                piece, old_pos, was_king, skip_data = self.simulate_move(game, piece_pos, move, skipped)
-                eval_score, _ = self.minimax(game, depth - 1, alpha, beta, False)
-                self.undo_move(game, piece, old_pos, was_king, skip_data)
-
-                if eval_score > max_eval:
-                    max_eval = eval_score
-                    best_move = (piece_pos, move)
-                alpha = max(alpha, max_eval)
-                if beta <= alpha:
-                    break
-            return max_eval, best_move
-        else:
-            min_eval = float('inf')
-            for piece_pos, move, skipped in valid_moves:
-                piece, old_pos, was_king, skip_data = self.simulate_move(game, piece_pos, move, skipped)
-                eval_score, _ = self.minimax(game, depth - 1, alpha, beta, True)
-                self.undo_move(game, piece, old_pos, was_king, skip_data)
-
-                if eval_score < min_eval:
-                    min_eval = eval_score
-                    best_move = (piece_pos, move)
-                beta = min(beta, min_eval)
-                if beta <= alpha:
-                    break
-            return min_eval, best_move
+        for move in valid_moves:
+            position.make_move(move)
+            if pvs and best_move is not None:
+                # Only prove the move is no better than alpha; search it
+                # again with the full window when that fails
+                score = -self.minimax(position, depth - 1, -alpha - 1, -alpha)[0]
+                if alpha < score < beta:
+                    score = -self.minimax(position, depth - 1, -beta, -alpha)[0]
+            else:
+                score = -self.minimax(position, depth - 1, -beta, -alpha)[0]
+            position.unmake_move()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if stats is not None:
+                            stats.cutoff(valid_moves.index(move))
+                        if self.heuristics and not move[2]:
+                            self.record_cutoff(move, depth)
+                        break
+
+        if tt is not None:
+            if best_score <= original_alpha:
+                bound = UPPER
+            elif best_score >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            tt.store(position.hash, depth, best_score, bound, best_move)
+        return best_score, best_move
+
+    def order_moves(self, moves, depth):
+        """
+        Sort the quiet moves of ``moves`` in place, after the captures that
+        the generator puts first: killers of ``depth``, then by history score.
+        """
+        start = 0
+        while start < len(moves) and moves[start][2]:
+            start += 1
+        if len(moves) - start < 2:
+            return
+        quiet = moves[start:]
+        history = self.history
+        quiet.sort(key=lambda move: history.get(move, 0), reverse=True)
+        for killer in reversed(self.killers.get(depth, ())):
+            if killer in quiet:
+                quiet.remove(killer)
+                quiet.insert(0, killer)
+        moves[start:] = quiet
+
+    def record_cutoff(self, move, depth):
+        killers = self.killers.setdefault(depth, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLER_SLOTS:]
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+    def quiesce(self, position, alpha, beta, ply):
+        """
+        Score of a leaf once the exchanges in progress are played out. Captures
+        are compulsory, so a side that can capture has no standing pat: its
+        captures are searched and the static score is only taken on a quiet
+        position, or once the leaf's QUIESCENCE_NODES run out. ``ply`` counts
+        from the leaf.
+        """
+        self.nodes += 1
+        if not self.nodes & CLOCK_CHECK and self._out_of_time():
+            raise SearchTimeout
+        stats = self.stats
+        if stats is not None:
+            stats.qnodes += 1
+            stats.max_qdepth = max(stats.max_qdepth, ply)
+        captures = position.captures()
+        if not captures or self.qnodes_left <= 0:
+            if captures and stats is not None:
+                stats.qlimit_hits += 1
+            if stats is None:
+                return self._evaluate(position)
+            return stats.evaluate(self._evaluate, position)
+        best_score = float('-inf')
+        for move in captures:
+            if self.qnodes_left <= 0:
+                break
+            self.qnodes_left -= 1
+            position.make_move(move)
+            score = -self.quiesce(position, -beta, -alpha, ply + 1)
+            position.unmake_move()
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best_score
+
+    def _out_of_time(self):
+        if self.should_stop is not None and self.should_stop():
+            return True
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def _tablebase_score(self, result, distance):
+        if result == WIN:
+            return TABLEBASE_WIN - distance
+        if result == LOSS:
+            return distance - TABLEBASE_WIN
+        return 0
+
+    def _evaluate(self, position):
+        score = self.evaluate_board(position)
+        return score if position.turn == self.side else -score
+
+    def time_budget(self, remaining):
+        """Seconds to spend on a move with ``remaining`` seconds left on the clock"""
+        return min(TIME_ALLOCATION[self.difficulty], remaining / MOVES_TO_GO)
+
+    def search(self, position, budget=None):
+        """
+        Best move for the side to move in ``position``, deepening one ply at a
+        time up to the configured depth. With a ``budget`` in seconds the search
+        stops once it runs out and the last completed iteration is played.
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self.pv_moves = {}
+        self.stats = SearchStats() if self.collect_stats else None
+        self.history = {}
+        if self.tt is not None:
+            self.tt.new_search()
+        # An interrupted iteration leaves its moves applied, so work on a copy
+        position = position.copy()
+
+        best_score, best_move, completed = None, None, 0
+        # (depth, elapsed, nodes, best move) of every completed iteration
+        iterations = []
+        for depth in range(1, self.depth + 1):
+            # The first iteration always completes so there is a move to play
+            if budget is not None and depth > 1:
+                self.deadline = start + budget
+            self.root_depth = depth
+            # Killers are kept by depth, which only matches plies within one iteration
+            self.killers = {}
+            try:
+                score, move = self._iterate(position, depth, best_score)
+            except SearchTimeout:
+                break
+            finally:
+                self.deadline = self.root_depth = None
+            best_score, best_move, completed = score, move, depth
+            iterations.append((depth, time.perf_counter() - start, self.nodes, move))
+            self.pv_moves = self._principal_variation(position, move)
+
+        stats = self.stats
+        if stats is not None:
+            stats.nodes = self.nodes
+            stats.pv = list(self.pv_moves.values())
+        self.last_search = {
+            "depth": completed,
+            "elapsed": time.perf_counter() - start,
+            "nodes": self.nodes,
+            "score": best_score,
+            "pv": list(self.pv_moves.values()),
+            "iterations": iterations,
+            "stats": stats.as_dict() if stats is not None else None,
+        }
+        self.stats = None
+        return best_move
+
+    def _iterate(self, position, depth, previous):
+        """
+        One iteration of ``search``. In "pvs" mode the root window starts
+        ASPIRATION_WINDOW either side of the ``previous`` iteration's score;
+        a score outside it is only a bound, so the failing side is opened up
+        and the iteration searched again.
+        """
+        alpha, beta = float('-inf'), float('inf')
+        if self.search_mode == "pvs" and previous is not None:
+            alpha, beta = previous - ASPIRATION_WINDOW, previous + ASPIRATION_WINDOW
+        while True:
+            score, move = self._search_root(position, depth, alpha, beta)
+            if score <= alpha:
+                alpha = float('-inf')
+            elif score >= beta:
+                beta = float('inf')
+            else:
+                return score, move
+
+    def _search_root(self, position, depth, alpha=float('-inf'), beta=float('inf')):
+        return self.minimax(position, depth, alpha, beta)
+
+    def _principal_variation(self, position, move):
+        """Map each position along the PV to its best move, following the TT"""
+        pv_moves = {}
+        saved = []
+        while move is not None and position.hash not in pv_moves:
+            pv_moves[position.hash] = move
+            saved.append(position.apply(move))
+            entry = self.tt.probe(position.hash) if self.tt is not None else None
+            move = entry[3] if entry is not None else None
+            if move is not None and move not in position.moves():
+                move = None
+        for state in reversed(saved):
+            position.restore(state)
+        return pv_moves
+
+    def book_move(self, position):
+        """
+        Move from the opening book for ``position``, or None once out of book.
+        ``last_search`` then describes the book move.
+        """
+        if self.book is None:
+            return None
+        start = time.perf_counter()
+        move = self.book.choose(position)
+        if move is not None:
+            self.last_search = {
+                "depth": 0,
+                "elapsed": time.perf_counter() - start,
+                "nodes": 0,
+                "score": None,
+                "pv": [move],
+                "iterations": [],
+                "stats": None,
+                "book": True,
+            }
+        return move
 
     def make_move(self, game):
-        valid_moves = self.get_all_moves(game)
+        position = game.board.to_position(self.color)
+        valid_moves = self.get_all_moves(position)
         if not valid_moves:
             return False
 
-        _, best_move = self.minimax(game, self.depth, float('-inf'), float('inf'), True)
-        if best_move is None:
-            piece_pos, move, _ = random.choice(valid_moves)
-        else:
-            piece_pos, move = best_move
+        best_move = self.book_move(position)
+        if best_move is not None:
+            self.play_move(game, best_move, self.last_search)
+            return True
 
-        game.select(*piece_pos)
-        game.select(*move)
+        budget = self.time_budget(game.remaining_time(self.color))
+        best_move = self.search(position, budget)
+        if best_move is None:
+            best_move = random.choice(valid_moves)
+        self.play_move(game, best_move, self.last_search)
         return True
+
+    def play_move(self, game, move, info):
+        """Play ``move`` on ``game`` and report how the search that found it went"""
+        if info.get("book"):
+            print("[AI] book move")
+        else:
+            print(f"[AI] depth {info['depth']} in {info['elapsed']:.2f}s ({info['nodes']} nodes)")
+        # The thinking time is charged to the AI's clock before the turn passes
+        game.update_timers()
+        frm, to, captured = move
+        game.select(*square_of(frm))
+        # Two chains may end on the same square, play the one searched
+        game.valid_moves[square_of(to)] = [game.board.get_piece(*square_of(bit)) for bit in iter_bits(captured)]
+        game.select(*square_of(to))
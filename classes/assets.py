@@ -0,0 +1,64 @@
+import os
+
+import pygame
+
+ASSETS_DIR = "assets"
+# Pixel font of the game's titles, buttons, turn indicator and timers
+FONT_FILE = "ps2p.ttf"
+
+_images = {}
+_fonts = {}
+_sounds = {}
+
+
+def image(name, size=None, alpha=False):
+    """
+    Image ``name`` of the assets directory, scaled to ``size`` if given, decoded
+    and scaled once per key. Once the window exists it is converted to the
+    display's pixel format (``alpha`` keeps per-pixel transparency, for the
+    pieces), so blits need no conversion. The surface is shared: blit it,
+    never draw on it.
+    """
+    key = (name, size, alpha)
+    entry = _images.get(key)
+    if entry is not None and (entry[1] or pygame.display.get_surface() is None):
+        return entry[0]
+    if entry is not None:
+        # Loaded before the window was opened: convert it now
+        surface = entry[0]
+    elif size is None:
+        surface = pygame.image.load(os.path.join(ASSETS_DIR, name))
+    else:
+        surface = pygame.transform.scale(image(name, alpha=alpha), size)
+    converted = pygame.display.get_surface() is not None
+    if converted:
+        surface = surface.convert_alpha() if alpha else surface.convert()
+    _images[key] = (surface, converted)
+    return surface
+
+
+def font(size, name=None, bold=False):
+    """
+    Shared Font of ``size``: the game's pixel font, or the system font
+    ``name``. Each one is opened once, SysFont lookups included.
+    """
+    key = (name, size, bold)
+    loaded = _fonts.get(key)
+    if loaded is None:
+        if name is None:
+            loaded = pygame.font.Font(os.path.join(ASSETS_DIR, FONT_FILE), size)
+        else:
+            loaded = pygame.font.SysFont(name, size, bold=bold)
+        _fonts[key] = loaded
+    return loaded
+
+
+def sound(name):
+    """Sound ``name`` of the assets directory, loaded once; None if it cannot play"""
+    if name not in _sounds:
+        try:
+            _sounds[name] = pygame.mixer.Sound(os.path.join(ASSETS_DIR, name))
+        except pygame.error as e:
+            print(f"[ERROR] Failed to load {name}: {e}")
+            _sounds[name] = None
+    return _sounds[name]
@@ -0,0 +1,92 @@
+import mmap
+import random
+import struct
+
+from .rules import unpack_move
+
+# File layout: MAGIC, then fixed-size records sorted by (key, move). A record
+# is the Zobrist hash of a position, a move packed with pack_move and the
+# weight of that move (how often it was played when the book was built).
+MAGIC = b"CKBOOK1\n"
+RECORD = struct.Struct("<QQI")
+
+# Book shipped with the game, used by AIPlayer when it exists
+BOOK_PATH = "assets/book.bin"
+
+
+def write_book(path, weights):
+    """Write ``{(key, packed_move): weight}`` to ``path`` as a sorted book"""
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        for (key, move), weight in sorted(weights.items()):
+            f.write(RECORD.pack(key, move, min(weight, 0xFFFFFFFF)))
+
+
+def read_book(path):
+    """Every record of the book at ``path`` as ``{(key, packed_move): weight}``"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an opening book")
+        return {(key, move): weight for key, move, weight in RECORD.iter_unpack(f.read())}
+
+
+class OpeningBook:
+    """
+    Read-only opening book. The file is memory-mapped and searched in place
+    with a binary search over the sorted keys, so opening it costs nothing
+    however large it is.
+    """
+
+    def __init__(self, path=BOOK_PATH):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an opening book")
+        self.count = (len(self.map) - len(MAGIC)) // RECORD.size
+        self.hits = self.misses = 0
+
+    def _key_at(self, index):
+        return RECORD.unpack_from(self.map, len(MAGIC) + index * RECORD.size)[0]
+
+    def lookup(self, key):
+        """``[(move, weight), ...]`` stored for the position with hash ``key``"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        moves = []
+        for index in range(low, self.count):
+            record_key, move, weight = RECORD.unpack_from(self.map, len(MAGIC) + index * RECORD.size)
+            if record_key != key:
+                break
+            moves.append((unpack_move(move), weight))
+        return moves
+
+    def choose(self, position, rng=random):
+        """A legal book move for ``position`` picked by weight, or None"""
+        legal = position.moves()
+        entries = [(move, weight) for move, weight in self.lookup(position.hash)
+                   if move in legal and weight > 0]
+        if not entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        moves, weights = zip(*entries)
+        return rng.choices(moves, weights)[0]
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+def load_book(path=BOOK_PATH):
+    """The book at ``path``, or None when there is no usable book there"""
+    try:
+        return OpeningBook(path)
+    except (OSError, ValueError):
+        return None
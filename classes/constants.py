@@ -1,5 +1,3 @@
-import pygame
-
 WIDTH, HEIGHT = 1280,720
 ROWS, COLS = 8, 8
 SQUARE_SIZE = 75
@@ -16,5 +14,3 @@ BOARD_LIGHT = (240, 217, 181)
 
 PIECE_DARK = BLACK
 PIECE_LIGHT = RED
-
-CROWN = pygame.transform.scale(pygame.image.load('assets/crown.png'), (44, 25))
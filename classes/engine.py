@@ -0,0 +1,200 @@
+import atexit
+import multiprocessing
+import queue
+import time
+
+from .ai import AIPlayer
+from .parallel import ParallelAIPlayer
+from .rules import Position
+
+
+def _serve(color, difficulty, workers, tt_megabytes, requests, results, current, deadline):
+    """
+    Worker process loop: search each ``(search_id, snapshot, budget,
+    collect_stats)`` request and post ``(search_id, move, info)`` back. A
+    search stops as soon as ``current`` no longer holds its id, which is how
+    the UI cancels it, or once the shared ``deadline`` (a time.time() value,
+    0 for none) passes and the first iteration is done.
+    """
+    if workers > 1:
+        ai = ParallelAIPlayer(color, difficulty, tt_megabytes, workers=workers, book_path=None)
+    else:
+        ai = AIPlayer(color, difficulty, tt_megabytes, book_path=None)
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        search_id, snapshot, budget, collect_stats = request
+        if current.value != search_id:
+            continue
+        ai.collect_stats = collect_stats
+        # Like a budget, the deadline of a ponder hit spares the first
+        # iteration, so that there is always a move to play
+        ai.should_stop = lambda: (current.value != search_id
+                                  or 0 < deadline.value <= time.time() and ai.root_depth > 1)
+        move = ai.search(Position(*snapshot), budget)
+        if current.value == search_id:
+            results.put((search_id, move, ai.last_search))
+    if workers > 1:
+        ai.close()
+
+
+class Engine:
+    """
+    Asynchronous front end to AIPlayer for the game loop.
+
+    ``start`` sends a snapshot of the position to a worker process and returns
+    at once; ``poll`` is called every frame and plays the move on the game when
+    it arrives. The worker is started with "spawn" so it does not inherit the
+    pygame window, and keeps its transposition table between moves.
+
+    With ``ponder`` the worker goes on searching during the opponent's turn,
+    on the position after the reply predicted by the principal variation. If
+    that reply is played the ponder search becomes the real one (a hit);
+    otherwise it is dropped and only its transposition table entries remain.
+
+    With ``workers`` above 1 the worker splits each search over a pool of
+    that many processes (see ParallelAIPlayer), sharing one transposition
+    table of ``tt_megabytes``.
+
+    With ``collect_stats`` set, searches started from then on count their
+    nodes, cutoffs, evaluation and move generation calls (see SearchStats);
+    ``stats`` holds those of the last move played.
+    """
+
+    def __init__(self, color, difficulty="medium", ponder=True, workers=1, tt_megabytes=16):
+        self.color = color
+        self.ponder_enabled = ponder
+        # Local player for the time budget, the opening book and for playing
+        # the returned move
+        self.player = AIPlayer(color, difficulty, tt_megabytes=0)
+        context = multiprocessing.get_context("spawn")
+        self.requests = context.Queue()
+        self.results = context.Queue()
+        # Id of the search the worker should be running, 0 when none
+        self.current = context.RawValue("q", 0)
+        # Wall-clock time at which the running search must stop, 0 for none
+        self.deadline = context.RawValue("d", 0.0)
+        self.last_id = 0
+        # Search the UI is waiting for, and the ponder search in progress
+        self.waiting = 0
+        self.ponder_id = 0
+        self.ponder_hash = None
+        # Result that arrived before it was asked for: a finished ponder
+        # search, or a book move that needs no search at all
+        self.ready = None
+        self.ponder_hits = self.ponder_misses = 0
+        self.collect_stats = False
+        # last_search of the AI that found the last move played
+        self.last_search = None
+        self.process = context.Process(
+            target=_serve,
+            args=(color, difficulty, workers, tt_megabytes,
+                  self.requests, self.results, self.current, self.deadline),
+            # A daemon process may not start the pool of its own
+            daemon=workers == 1)
+        self.process.start()
+        if workers > 1:
+            # Python waits for non-daemon children on exit, so make sure it ends
+            atexit.register(self.close)
+
+    @property
+    def searching(self):
+        return self.waiting != 0
+
+    @property
+    def stats(self):
+        return self.last_search.get("stats") if self.last_search else None
+
+    def _request(self, position, budget):
+        self.last_id += 1
+        self.deadline.value = 0.0
+        self.current.value = self.last_id
+        self.requests.put((self.last_id, position.snapshot(), budget, self.collect_stats))
+        return self.last_id
+
+    def start(self, game):
+        """Start searching the current position of ``game`` in the worker"""
+        position = game.board.to_position(self.color)
+        budget = self.player.time_budget(game.remaining_time(self.color))
+        move = self.player.book_move(position)
+        if move is not None:
+            # In book: nothing to search, poll plays the move on the next frame
+            self.current.value = self.ponder_id = 0
+            self.last_id += 1
+            self.waiting = self.last_id
+            self.ready = (self.waiting, move, self.player.last_search)
+        elif self.ponder_id and position.hash == self.ponder_hash:
+            # Ponder hit: keep the running search and give it the move's budget
+            self.ponder_hits += 1
+            self.waiting = self.ponder_id
+            if self.ready is None:
+                self.deadline.value = time.time() + budget
+        else:
+            if self.ponder_id:
+                self.ponder_misses += 1
+            self.ready = None
+            self.waiting = self._request(position, budget)
+        self.ponder_id = 0
+
+    def poll(self, game):
+        """
+        Play the worker's move on ``game`` if it has arrived. Returns True once
+        the pending search is over (even if there was no move to play).
+        """
+        if self.waiting and self.ready is not None:
+            return self._finish(game, *self.ready)
+
+        while self.waiting or self.ponder_id:
+            try:
+                search_id, move, info = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if search_id == self.waiting:
+                return self._finish(game, search_id, move, info)
+            if search_id == self.ponder_id:
+                # Finished before the opponent moved, kept for a hit
+                self.ready = (search_id, move, info)
+
+        if self.waiting and not self.process.is_alive():
+            # The worker died, fall back to searching in this process
+            print("[AI] Engine process exited, searching in the game loop")
+            self.waiting = self.current.value = 0
+            self.player.collect_stats = self.collect_stats
+            self.player.make_move(game)
+            self.last_search = self.player.last_search
+            return True
+        return False
+
+    def _finish(self, game, search_id, move, info):
+        self.waiting = self.current.value = 0
+        self.ready = None
+        if move is not None:
+            self.last_search = info
+            self.player.play_move(game, move, info)
+            self._ponder(game, info["pv"])
+        return True
+
+    def _ponder(self, game, pv):
+        """Search the position after the opponent reply predicted by ``pv``"""
+        if not self.ponder_enabled or len(pv) < 2:
+            return
+        position = game.board.to_position(game.turn)
+        if pv[1] not in position.moves():
+            return
+        position.apply(pv[1])
+        self.ponder_hash = position.hash
+        self.ponder_id = self._request(position, None)
+
+    def cancel(self):
+        """Abandon the pending search or ponder, its result will be ignored"""
+        self.waiting = self.ponder_id = self.current.value = 0
+        self.ready = None
+
+    def close(self):
+        self.cancel()
+        if self.process.is_alive():
+            self.requests.put(None)
+            self.process.join(timeout=1)
+            if self.process.is_alive():
+                self.process.terminate()
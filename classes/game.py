@@ -5,6 +5,16 @@ import time
 
 # Import Piece class
 from .piece import Piece
+from .assets import image, sound
+from .text import get_font, render
+from .render import DirtyRenderer
+from .loop import IDLE_TIMEOUT
+from .rules import DARK, LIGHT, COLORS, Position, bit_of, square_of, iter_bits, side_of
+
+# Score panel with its border (see Game.draw_scores), and where the AI
+# stats panel goes: under the score panel, left of the board
+SCORE_RECT = pygame.Rect(38, 18, 254, 124)
+DEBUG_POS = (20, 160)
 
 class Game:
     def __init__(self, win, difficulty, show_help=False):
@@ -13,8 +23,8 @@ class Game:
         self._init()
         self.win = win
         self.board_offset_y = 200
-        self.black_icon = pygame.image.load("assets/black_piece.png")
-        self.red_icon = pygame.image.load("assets/white_piece.png")
+        self.black_icon = image("black_piece.png", alpha=True)
+        self.red_icon = image("white_piece.png", alpha=True)
         # Adjust pause button position for smaller window
         self.pause_button = pygame.Rect(WIDTH - 110, 20, 100, 100)
         self.pause_icon_color = (255, 255, 255)
@@ -23,13 +33,19 @@ class Game:
         self.white_time = 10 * 60
         self.last_time = time.time()
         self.is_paused = False
-        # Load move sound
-        try:
-            self.move_sound = pygame.mixer.Sound('assets/move-self.mp3')
-            self.enable_move_sound = False  # Default to False, set in main.py
-        except pygame.error as e:
-            print(f"[ERROR] Failed to load move-self.mp3: {e}")
-            self.move_sound = None
+        # Only the parts of the window that changed are redrawn each frame;
+        # with dirty_rects off every frame is a full repaint
+        self.renderer = DirtyRenderer()
+        self.dirty_rects = True
+        # Search stats of the AI's last move (a SearchStats dict) and whether
+        # to draw them over the window, toggled with F3 against the AI
+        self.show_debug = False
+        self.debug_stats = None
+        # Stats the debug panel was drawn for, and the panel
+        self.debug_drawn = (None, None)
+        # Move sound, None if it could not be loaded
+        self.move_sound = sound('move-self.mp3')
+        self.enable_move_sound = False  # Default to False, set in main.py
 
     def _init(self):
         self.selected = None
@@ -44,8 +60,47 @@ class Game:
         self.last_time = time.time()
         self.is_paused = False
 
+    @property
+    def turn(self):
+        return self._turn
+
+    @turn.setter
+    def turn(self, color):
+        # Keep the side to move of the rules position (and so its hash) in sync
+        self._turn = color
+        self.board.position.set_turn(side_of(color))
+
     def update(self):
-        # Update timers
+        self.update_timers()
+        layers = self.board.layers(self.win, self.turn, self.black_time, self.white_time,
+                                   self.valid_moves if self.show_valid_moves else {})
+        layers.append(("scores", (self.black_score, self.white_score), SCORE_RECT,
+                       lambda win: self.draw_scores()))
+        layers.append(("pause", self.pause_icon_color, self.pause_button,
+                       lambda win: self.draw_pause_button()))
+        if self.show_debug:
+            panel = self.debug_panel()
+            layers.append(("debug", panel, panel.get_rect(topleft=DEBUG_POS),
+                           lambda win: win.blit(panel, DEBUG_POS)))
+        if not self.dirty_rects:
+            self.renderer.invalidate()
+        self.renderer.frame(self.win, self.board.get_background(self.win), layers)
+
+    def idle_timeout(self):
+        """
+        Milliseconds the game loop may sleep with nothing new to draw: until
+        the running timer shows its next second. None while the window waits
+        for a full repaint or valid moves are pulsing.
+        """
+        if self.renderer.full or (self.show_valid_moves and self.valid_moves):
+            return None
+        if self.is_paused:
+            return IDLE_TIMEOUT
+        remaining = self.remaining_time(self.turn)
+        return int((remaining - math.floor(remaining)) * 1000) + 1
+
+    def update_timers(self):
+        # Charge the time since the last call to the side to move
         if not self.is_paused:
             current_time = time.time()
             elapsed = current_time - self.last_time
@@ -55,12 +110,8 @@ class Game:
                 self.white_time = max(0, self.white_time - elapsed)
             self.last_time = current_time
 
-        self.board.draw(self.win, self.turn, self.black_time, self.white_time)
-        if self.show_valid_moves:
-            self.draw_valid_moves(self.valid_moves)
-        self.draw_scores()
-        self.draw_pause_button()
-        pygame.display.update()
+    def remaining_time(self, color):
+        return self.black_time if color == PIECE_DARK else self.white_time
 
     def winner(self):
         # Check for timer-based wins
@@ -108,7 +159,8 @@ class Game:
 
     def _move(self, row, col):
         piece = self.board.get_piece(row, col)
-        if self.selected and piece == 0 and (row, col) in self.valid_moves:
+        # A king's capture chain may end back on its own square
+        if self.selected and (piece == 0 or piece is self.selected) and (row, col) in self.valid_moves:
             self.board.move(self.selected, row, col)
             skipped = self.valid_moves[(row, col)]
             
@@ -118,20 +170,7 @@ class Game:
                     self.black_score += len(skipped)
                 else:
                     self.white_score += len(skipped)
-                new_moves = self.board.get_valid_moves(self.selected)
-                capture_moves = {move: skips for move, skips in new_moves.items() if skips}
-                
-                if capture_moves:
-                    self.valid_moves = capture_moves
-                    return True
-            
-            if row == 0 or row == ROWS - 1:
-                self.selected.make_king()
-                if self.selected.color == PIECE_LIGHT:
-                    self.board.red_kings += 1
-                else:
-                    self.board.white_kings += 1
-            
+
             self.change_turn()
             # Play move sound if available and enabled
             if self.move_sound and getattr(self, 'enable_move_sound', False):
@@ -142,12 +181,9 @@ class Game:
             return True
         return False
 
-    def draw_valid_moves(self, moves):
-        self.board.draw_valid_moves(self.win, moves)  # Pass win to Board.draw_valid_moves
-
     def draw_scores(self):
-        font = pygame.font.SysFont('Consolas', 40, bold=True)
-        title_font = pygame.font.SysFont('Consolas', 35, bold=True)
+        font = get_font(40, 'Consolas', bold=True)
+        title_font = get_font(35, 'Consolas', bold=True)
         screen_width = self.win.get_width()
         rect_width = 250  # Reduced width
         rect_height = 120
@@ -162,23 +198,54 @@ class Game:
         pygame.draw.rect(self.win, (128, 128, 128), (rect_x, rect_y, rect_width, rect_height), border_radius=border_radius)
 
         # Draw "Score" title
-        title_text = title_font.render("Score", True, (255, 255, 255))
+        title_text = render(title_font, "Score", (255, 255, 255))
         title_rect = title_text.get_rect(centerx=rect_x + rect_width//2, top=rect_y + 10)
         self.win.blit(title_text, title_rect)
 
         # Draw scores
         # Black score (left)
-        black_score_text = font.render(str(self.black_score), True, (255, 255, 255))
+        black_score_text = render(font, str(self.black_score), (255, 255, 255))
         black_score_rect = black_score_text.get_rect(center=(rect_x + rect_width//4, rect_y + 80))
         pygame.draw.circle(self.win, (0, 0, 0), black_score_rect.center, 35)
         self.win.blit(black_score_text, black_score_rect)
 
         # White score (right)
-        white_score_text = font.render(str(self.white_score), True, (0, 0, 0))
+        white_score_text = render(font, str(self.white_score), (0, 0, 0))
         white_score_rect = white_score_text.get_rect(center=(rect_x + 3*rect_width//4, rect_y + 80))
         pygame.draw.circle(self.win, (255, 255, 255), white_score_rect.center, 35)
         self.win.blit(white_score_text, white_score_rect)
 
+    def debug_panel(self):
+        """Panel of the AI stats, drawn again only when new stats arrive"""
+        stats = self.debug_stats
+        if self.debug_drawn[1] is not None and self.debug_drawn[0] is stats:
+            return self.debug_drawn[1]
+        font = get_font(16, 'Consolas')
+        if stats is None:
+            lines = ["AI stats: next search"]
+        else:
+            searched = sum(stats["cutoffs"])
+            first = stats["cutoffs"][0] / searched if searched else 0.0
+            pv = " ".join("{}{}-{}{}".format(*square_of(frm), *square_of(to)) for frm, to, _ in stats["pv"][:6])
+            lines = [
+                f"nodes {stats['nodes']}  leaves {stats['leaves']}  quiescence {stats['qnodes']}",
+                f"max depth {stats['max_depth']} + {stats['max_qdepth']}",
+                f"eval {stats['eval_calls']} in {stats['eval_time'] * 1000:.0f}ms",
+                f"movegen {stats['movegen_calls']} in {stats['movegen_time'] * 1000:.0f}ms",
+                f"tt {stats['tt_hits']}/{stats['tt_probes']}  tb {stats['tablebase_hits']}",
+                f"cutoffs {searched} ({first:.0%} first move)",
+                f"pv {pv}",
+            ]
+        line_height = font.get_linesize()
+        width = max(font.size(line)[0] for line in lines) + 20
+        height = line_height * len(lines) + 20
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for index, line in enumerate(lines):
+            panel.blit(render(font, line, (255, 255, 255)), (10, 10 + index * line_height))
+        self.debug_drawn = (stats, panel)
+        return panel
+
     def change_turn(self):
         self.valid_moves = {}
         if self.turn == PIECE_DARK:
@@ -235,6 +302,8 @@ class Game:
         if not self.is_paused:
             # Reset the last_time when unpausing to prevent time jump
             self.last_time = time.time()
+            # The pause menu drew over the whole window
+            self.renderer.invalidate()
 
     def format_time(self, seconds):
         minutes = int(seconds // 60)
@@ -242,228 +311,216 @@ class Game:
         return f"{minutes:02d}:{seconds:02d}"
 
 class Board:
+    """
+    Pygame view of a rules Position: the Piece grid mirrors ``self.position``,
+    which is the source of truth for moves, captures and counts.
+    """
     def __init__(self, game):
         self.game = game  # Set the Game instance directly during initialization
         self.board = []
-        self.red_left = self.white_left = 12
-        self.red_kings = self.white_kings = 0
+        self.position = Position()
         self.create_board()
         # Calculate offsets for centering
         self.board_offset_x = (WIDTH - (COLS * SQUARE_SIZE)) // 2
         self.board_offset_y = (HEIGHT - (ROWS * SQUARE_SIZE)) // 2
+        # Window rect and layer name of every square, for the dirty renderer
+        self.square_rects = [[pygame.Rect(col * SQUARE_SIZE + self.board_offset_x, row * SQUARE_SIZE + self.board_offset_y,
+                                          SQUARE_SIZE, SQUARE_SIZE) for col in range(COLS)] for row in range(ROWS)]
+        self.square_names = [[("square", row, col) for col in range(COLS)] for row in range(ROWS)]
         # Load wooden background
-        self.wood_bg = pygame.image.load("assets/wood.jpeg")
-        self.wood_bg = pygame.transform.scale(self.wood_bg, (COLS * SQUARE_SIZE, ROWS * SQUARE_SIZE))
-        # Initialize font for turn indicator
-        self.font = pygame.font.Font("assets/ps2p.ttf", 36)
+        self.wood_bg = image("wood.jpeg", (COLS * SQUARE_SIZE, ROWS * SQUARE_SIZE))
+        # Tints of the dark and light squares, drawn at alpha 180 over the wood
+        self.square_colors = (BOARD_DARK, BOARD_LIGHT)
+        # Grey background, wood and tinted squares composited once, and the
+        # (window size, square colors) they were built for
+        self.background = None
+        self.background_key = None
+        # Fonts of the turn indicator and the timers
+        self.font = get_font(36)
+        self.timer_font = get_font(28)
     
-    def draw_turn_indicator(self, win, turn, black_time, white_time):
+    def hud_layers(self, turn, black_time, white_time):
+        """Layers of the turn indicator and the two timers, see DirtyRenderer"""
         # Create text for turn
         turn_text = "WHITE'S TURN" if turn == PIECE_LIGHT else "BLACK'S TURN"
-        text_surface = self.font.render(turn_text, True, (255, 0, 0))  # Red color
+        text_surface = render(self.font, turn_text, (255, 0, 0))  # Red color
         
         # Calculate position (centered above the board)
         text_rect = text_surface.get_rect(centerx=self.board_offset_x + (COLS * SQUARE_SIZE) // 2,
                                         top=self.board_offset_y - 50)
         
         # Draw text with a subtle shadow for better visibility
-        shadow_surface = self.font.render(turn_text, True, (0, 0, 0))
+        shadow_surface = render(self.font, turn_text, (0, 0, 0))
         shadow_rect = text_rect.copy()
         shadow_rect.x += 2
         shadow_rect.y += 2
-        win.blit(shadow_surface, shadow_rect)
-        win.blit(text_surface, text_rect)
 
-        # Draw timers
-        timer_font = pygame.font.Font("assets/ps2p.ttf", 28)
-        
+        def draw_turn(win):
+            win.blit(shadow_surface, shadow_rect)
+            win.blit(text_surface, text_rect)
+
+        # Timers: the text only changes with the displayed second, so render()
+        # hands back the same surface and the layer stays clean in between
         # Black timer (extreme left)
         black_time_text = f"BLACK: {self.format_time(black_time)}"
-        black_surface = timer_font.render(black_time_text, True, (0, 0, 0))
+        black_surface = render(self.timer_font, black_time_text, (0, 0, 0))
         black_rect = black_surface.get_rect(
             left=20,  # 20px from left edge
             top=self.board_offset_y + (ROWS * SQUARE_SIZE) + 20  # 20px below the board
         )
-        win.blit(black_surface, black_rect)
         
         # White timer (extreme right)
         white_time_text = f"WHITE: {self.format_time(white_time)}"
-        white_surface = timer_font.render(white_time_text, True, (255, 255, 255))
+        white_surface = render(self.timer_font, white_time_text, (255, 255, 255))
         white_rect = white_surface.get_rect(
             right=WIDTH - 20,  # 20px from right edge
             top=self.board_offset_y + (ROWS * SQUARE_SIZE) + 20  # 20px below the board
         )
-        win.blit(white_surface, white_rect)
+        return [
+            ("turn", turn_text, text_rect.union(shadow_rect), draw_turn),
+            ("black_timer", black_time_text, black_rect, lambda win: win.blit(black_surface, black_rect)),
+            ("white_timer", white_time_text, white_rect, lambda win: win.blit(white_surface, white_rect)),
+        ]
 
     def format_time(self, seconds):
         minutes = int(seconds // 60)
         seconds = int(seconds % 60)
         return f"{minutes:02d}:{seconds:02d}"
 
-    def draw_squares(self, win):
-        # Fill background with grey
-        win.fill(GREY)
-        # Draw wooden background
-        win.blit(self.wood_bg, (self.board_offset_x, self.board_offset_y))
-        # Draw the squares with transparency
+    def build_background(self, size):
+        """Composite the static layer of the window: grey, wood and tinted squares"""
+        background = pygame.Surface(size)
+        background.fill(GREY)
+        background.blit(self.wood_bg, (self.board_offset_x, self.board_offset_y))
+        # The squares are tinted with transparency, all in one layer
+        squares = pygame.Surface((COLS * SQUARE_SIZE, ROWS * SQUARE_SIZE), pygame.SRCALPHA)
         for row in range(ROWS):
             for col in range(COLS):
-                color = BOARD_DARK if (row + col) % 2 == 0 else BOARD_LIGHT
-                s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-                pygame.draw.rect(s, (*color, 180), (0, 0, SQUARE_SIZE, SQUARE_SIZE))
-                win.blit(s, (col * SQUARE_SIZE + self.board_offset_x, 
-                           row * SQUARE_SIZE + self.board_offset_y))
+                color = self.square_colors[(row + col) % 2]
+                pygame.draw.rect(squares, (*color, 180), (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+        background.blit(squares, (self.board_offset_x, self.board_offset_y))
+        # Match the display's pixel format so the per-frame blit is a plain copy
+        if pygame.display.get_surface() is not None:
+            background = background.convert()
+        return background
+
+    def get_background(self, win):
+        # Rebuilt only when the window size or the square colors change
+        key = (win.get_size(), self.square_colors)
+        if key != self.background_key:
+            self.background = self.build_background(key[0])
+            self.background_key = key
+        return self.background
+
+    @property
+    def hash(self):
+        """Zobrist key of the position, side to move included"""
+        return self.position.hash
+
+    @property
+    def red_left(self):
+        return self.position.count(LIGHT)
+
+    @property
+    def white_left(self):
+        return self.position.count(DARK)
+
+    @property
+    def red_kings(self):
+        return self.position.king_count(LIGHT)
+
+    @property
+    def white_kings(self):
+        return self.position.king_count(DARK)
 
     def move(self, piece, row, col):
+        to = bit_of(row, col)
+        self.position.move_piece(bit_of(piece.row, piece.col), to)
         self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
         piece.move(row, col)
 
-        if row == ROWS - 1 or row == 0:
+        if self.position.kings & to:
             piece.make_king()
-            if piece.color == PIECE_LIGHT:
-                self.red_kings += 1
-            else:
-                self.white_kings += 1
 
     def get_piece(self, row, col):
         return self.board[row][col]
 
     def create_board(self):
-        for row in range(ROWS):
-            self.board.append([])
-            for col in range(COLS):
-                if col % 2 == ((row + 1) % 2):
-                    if row < 3:
-                        self.board[row].append(Piece(row, col, PIECE_LIGHT))
-                    elif row > 4:
-                        self.board[row].append(Piece(row, col, PIECE_DARK))
-                    else:
-                        self.board[row].append(0)
-                else:
-                    self.board[row].append(0)
+        # Build the Piece views for every occupied square of the position
+        self.board = [[0] * COLS for _ in range(ROWS)]
+        for bit in iter_bits(self.position.pieces[DARK] | self.position.pieces[LIGHT]):
+            row, col = square_of(bit)
+            piece = Piece(row, col, COLORS[self.position.side_at(bit)])
+            if self.position.kings & bit:
+                piece.make_king()
+            self.board[row][col] = piece
         
-    def draw(self, win, turn, black_time, white_time):
-        self.draw_squares(win)
-        self.draw_turn_indicator(win, turn, black_time, white_time)
+    def layers(self, win, turn, black_time, white_time, valid_moves):
+        """
+        Layers of the board for DirtyRenderer: the turn indicator, the timers
+        and one layer per square, whose key changes when its piece, the
+        selection or a valid-move pulse on it does.
+        """
+        layers = self.hud_layers(turn, black_time, white_time)
+        radius = self.pulse_radius() if valid_moves else 0
         for row in range(ROWS):
             for col in range(COLS):
                 piece = self.board[row][col]
+                pulse = radius if (row, col) in valid_moves else 0
                 if piece != 0:
-                    # Draw white border if the piece is selected
-                    if self.game.selected and piece == self.game.selected:
-                        # Draw a rounded rectangle border around the square with padding
-                        padding = 5  # Adjust padding size as needed
-                        rect_x = col * SQUARE_SIZE + self.board_offset_x + padding
-                        rect_y = row * SQUARE_SIZE + self.board_offset_y + padding
-                        rect_width = SQUARE_SIZE - 2 * padding
-                        rect_height = SQUARE_SIZE - 2 * padding
-                        border_thickness = 5  # Adjust thickness as needed
-                        border_radius = 15 # Adjust radius as needed for rounded corners
-
-                        # Draw shadow
-                        shadow_offset = 3 # Adjust shadow offset as needed
-                        shadow_color = (50, 50, 50) # Dark grey color for shadow
-                        pygame.draw.rect(win, shadow_color, (rect_x + shadow_offset, rect_y + shadow_offset, rect_width, rect_height), border_thickness, border_radius=border_radius)
-
-                        # Draw the white border
-                        pygame.draw.rect(win, (255, 255, 255), (rect_x, rect_y, rect_width, rect_height), border_thickness, border_radius=border_radius)
-
-                    piece.draw(win)
+                    key = (piece.color, piece.king, piece is self.game.selected, pulse)
+                elif pulse:
+                    key = (None, False, False, pulse)
+                else:
+                    key = None
+                layers.append((self.square_names[row][col], key, self.square_rects[row][col],
+                               lambda win, row=row, col=col, pulse=pulse: self.draw_square(win, row, col, pulse)))
+        return layers
+
+    def draw_square(self, win, row, col, pulse):
+        piece = self.board[row][col]
+        if piece != 0:
+            # Draw white border if the piece is selected
+            if self.game.selected and piece == self.game.selected:
+                # Draw a rounded rectangle border around the square with padding
+                padding = 5  # Adjust padding size as needed
+                rect_x = col * SQUARE_SIZE + self.board_offset_x + padding
+                rect_y = row * SQUARE_SIZE + self.board_offset_y + padding
+                rect_width = SQUARE_SIZE - 2 * padding
+                rect_height = SQUARE_SIZE - 2 * padding
+                border_thickness = 5  # Adjust thickness as needed
+                border_radius = 15 # Adjust radius as needed for rounded corners
+
+                # Draw shadow
+                shadow_offset = 3 # Adjust shadow offset as needed
+                shadow_color = (50, 50, 50) # Dark grey color for shadow
+                pygame.draw.rect(win, shadow_color, (rect_x + shadow_offset, rect_y + shadow_offset, rect_width, rect_height), border_thickness, border_radius=border_radius)
+
+                # Draw the white border
+                pygame.draw.rect(win, (255, 255, 255), (rect_x, rect_y, rect_width, rect_height), border_thickness, border_radius=border_radius)
+
+            piece.draw(win)
+        if pulse:
+            self.draw_pulse(win, row, col, pulse)
 
     def remove(self, pieces):
         for piece in pieces:
+            self.position.remove(bit_of(piece.row, piece.col))
             self.board[piece.row][piece.col] = 0
-            if piece.color == PIECE_LIGHT:
-                self.red_left -= 1
-            else:
-                self.white_left -= 1
     
     def winner(self):
-        if self.red_left <= 0:
-            return PIECE_DARK
-        elif self.white_left <= 0:
-            return PIECE_LIGHT
-        return None
+        return self.position.winner()
     
-    def get_valid_moves(self, piece):
-        moves = {}
-        left = piece.col - 1
-        right = piece.col + 1
-        row = piece.row
-
-        if piece.color == PIECE_DARK or piece.king:
-            moves.update(self._traverse_left(row - 1, max(row - 3, -1), -1, piece.color, left))
-            moves.update(self._traverse_right(row - 1, max(row - 3, -1), -1, piece.color, right))
-        if piece.color == PIECE_LIGHT or piece.king:
-            moves.update(self._traverse_left(row + 1, min(row + 3, ROWS), 1, piece.color, left))
-            moves.update(self._traverse_right(row + 1, min(row + 3, ROWS), 1, piece.color, right))
-    
-        return moves
-
-    def _traverse_left(self, start, stop, step, color, left, skipped=[]):
-        moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if left < 0:
-                break
-            
-            current = self.board[r][left]
-            if current == 0:
-                if skipped and not last:
-                    break
-                elif skipped:
-                    moves[(r, left)] = last + skipped
-                else:
-                    moves[(r, left)] = last
-                
-                if last:
-                    if step == -1:
-                        row = max(r - 3, 0)
-                    else:
-                        row = min(r + 3, ROWS)
-                    moves.update(self._traverse_left(r + step, row, step, color, left - 1, skipped=last))
-                    moves.update(self._traverse_right(r + step, row, step, color, left + 1, skipped=last))
-                break
-            elif current.color == color:
-                break
-            else:
-                last = [current]
-
-            left -= 1
-        
-        return moves
+    def to_position(self, color=PIECE_DARK):
+        """Copy of the rules position with ``color`` to move, for the AI"""
+        position = self.position.copy()
+        position.set_turn(side_of(color))
+        return position
 
-    def _traverse_right(self, start, stop, step, color, right, skipped=[]):
+    def get_valid_moves(self, piece):
         moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if right >= COLS:
-                break
-            
-            current = self.board[r][right]
-            if current == 0:
-                if skipped and not last:
-                    break
-                elif skipped:
-                    moves[(r, right)] = last + skipped
-                else:
-                    moves[(r, right)] = last
-                
-                if last:
-                    if step == -1:
-                        row = max(r - 3, 0)
-                    else:
-                        row = min(r + 3, ROWS)
-                    moves.update(self._traverse_left(r + step, row, step, color, right - 1, skipped=last))
-                    moves.update(self._traverse_right(r + step, row, step, color, right + 1, skipped=last))
-                break
-            elif current.color == color:
-                break
-            else:
-                last = [current]
-
-            right += 1
-        
+        for to, captured in self.position.piece_moves(bit_of(piece.row, piece.col)).items():
+            moves[square_of(to)] = [self.get_piece(*square_of(bit)) for bit in iter_bits(captured)]
         return moves
 
     def get_all_pieces(self, color):
@@ -474,10 +531,8 @@ class Board:
                     pieces.append(piece)
         return pieces
 
-    def draw_valid_moves(self, win, moves):
-        board_offset_x = (WIDTH - (COLS * SQUARE_SIZE)) // 2
-        board_offset_y = (HEIGHT - (ROWS * SQUARE_SIZE)) // 2
-        
+    def pulse_radius(self):
+        """Current radius of the pulsing circles on the valid moves"""
         t = pygame.time.get_ticks() / 1000.0  # Time in seconds
         animation_duration = 2.0 # Increased duration for a slower animation
         animation_progress = (t % animation_duration) / animation_duration # Progress from 0 to 1
@@ -488,50 +543,27 @@ class Board:
         # Calculate radius using a sine wave for grow and shrink effect
         # sin(pi * progress) goes from 0 to 1 and back to 0 over progress 0 to 1
         radius_factor = math.sin(animation_progress * math.pi)
-        current_radius = int(min_radius + radius_factor * (max_radius - min_radius))
-        
+        return int(min_radius + radius_factor * (max_radius - min_radius))
+
+    def draw_pulse(self, win, row, col, radius):
         # Keep alpha relatively constant for a pulsing effect
         alpha = 200 # Semi-transparent blue
 
-        for move in moves:
-            row, col = move
-            center_x = col * SQUARE_SIZE + SQUARE_SIZE // 2 + board_offset_x
-            center_y = row * SQUARE_SIZE + SQUARE_SIZE // 2 + board_offset_y
-            
-            # Draw the pulsing circle
-            if current_radius > 0 and alpha > 0:
-                circle_surface = pygame.Surface((current_radius * 2, current_radius * 2), pygame.SRCALPHA)
-                # Use a blue color with the calculated alpha
-                pygame.draw.circle(circle_surface, (0, 0, 255, alpha), (current_radius, current_radius), current_radius)
-                # Blit the circle surface onto the main window, centered
-                win.blit(circle_surface, (center_x - current_radius, center_y - current_radius))
+        center_x = col * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_x
+        center_y = row * SQUARE_SIZE + SQUARE_SIZE // 2 + self.board_offset_y
+        circle_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        # Use a blue color with the calculated alpha
+        pygame.draw.circle(circle_surface, (0, 0, 255, alpha), (radius, radius), radius)
+        # Blit the circle surface onto the main window, centered
+        win.blit(circle_surface, (center_x - radius, center_y - radius))
 
     def get_board_state(self):
         """
         Returns a serializable representation of the board state for network transmission
         """
-        state = {
-            "board_pieces": [],
-            "red_left": self.red_left,
-            "white_left": self.white_left,
-            "red_kings": self.red_kings,
-            "white_kings": self.white_kings,
-            "black_score": self.game.black_score if self.game else 0,  # Fallback to 0 if game is None
-            "white_score": self.game.white_score if self.game else 0   # Fallback to 0 if game is None
-        }
-        
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.board[row][col]
-                if piece != 0:
-                    # Store piece data in a serializable format
-                    piece_data = {
-                        "row": piece.row,
-                        "col": piece.col,
-                        "color": piece.color,
-                        "king": piece.king
-                    }
-                    state["board_pieces"].append(piece_data)
+        state = self.position.to_state()
+        state["black_score"] = self.game.black_score if self.game else 0  # Fallback to 0 if game is None
+        state["white_score"] = self.game.white_score if self.game else 0  # Fallback to 0 if game is None
         
         return state
 
@@ -542,25 +574,11 @@ class Board:
         if not state:
             return
             
-        # Reset board
-        for row in range(ROWS):
-            for col in range(COLS):
-                self.board[row][col] = 0
-        
-        # Set piece counts
-        self.red_left = state["red_left"]
-        self.white_left = state["white_left"]
-        self.red_kings = state["red_kings"]
-        self.white_kings = state["white_kings"]
+        # Piece counts are derived from the position, so only the pieces matter
+        self.position = Position.from_state(state, self.game.turn if self.game else PIECE_DARK)
+        self.create_board()
         
         # Set scores
         if self.game:
             self.game.black_score = state.get("black_score", 0)
-            self.game.white_score = state.get("white_score", 0)
-        
-        # Add pieces
-        for piece_data in state["board_pieces"]:
-            piece = Piece(piece_data["row"], piece_data["col"], piece_data["color"])
-            if piece_data["king"]:
-                piece.make_king()
-            self.board[piece_data["row"]][piece_data["col"]] = piece
\ No newline at end of file
+            self.game.white_score = state.get("white_score", 0)
\ No newline at end of file
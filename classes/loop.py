@@ -0,0 +1,47 @@
+import pygame
+
+# Frame rate of a loop with something moving on screen
+FPS = 60
+# Longest sleep of an idle loop, so it still looks at the clock now and then
+IDLE_TIMEOUT = 1000
+# Posted by the network receive thread after each message, to wake an idle loop
+NETWORK_EVENT = pygame.USEREVENT + 1
+
+
+def notify(event_type):
+    """Wake the loop blocked in FrameLoop.events, from any thread"""
+    try:
+        pygame.event.post(pygame.event.Event(event_type))
+    except pygame.error:
+        # No display (any more): nobody is waiting
+        pass
+
+
+class FrameLoop:
+    """
+    Pacing of a pygame loop that sleeps while nothing changes on screen.
+
+    ``events(timeout)`` replaces ``clock.tick(FPS)`` plus ``pygame.event.get()``.
+    With a ``timeout`` the loop is idle: it blocks in pygame.event.wait until
+    an event arrives (input, or a NETWORK_EVENT posted by another thread) or
+    ``timeout`` milliseconds pass, e.g. until a timer shows its next second.
+    With None something is animating and the loop runs at FPS.
+    """
+
+    def __init__(self):
+        self.clock = pygame.time.Clock()
+        # The first frame is drawn at once
+        self.started = False
+
+    def events(self, timeout=IDLE_TIMEOUT):
+        if timeout is None or not self.started:
+            self.started = True
+            self.clock.tick(FPS)
+            return pygame.event.get()
+        event = pygame.event.wait(max(1, min(timeout, IDLE_TIMEOUT)))
+        events = pygame.event.get()
+        if event.type != pygame.NOEVENT:
+            events.insert(0, event)
+        # Keep the clock from counting the sleep as one long frame
+        self.clock.tick()
+        return events
@@ -1,14 +1,15 @@
 import pygame
 import random
 from classes.constants import WIDTH, HEIGHT
+from classes.assets import image, sound
+from classes.text import get_font, render
+from classes.loop import FrameLoop, IDLE_TIMEOUT
 
-# Initialisation
-pygame.init()
-
-# Polices
-title_font = pygame.font.Font("assets/ps2p.ttf", 75)
-button_font = pygame.font.Font("assets/ps2p.ttf", 25)
-text_font = pygame.font.Font("assets/ps2p.ttf", 20)
+# Tailles des polices, ouvertes au premier affichage : importer ce module
+# (comme le fait le processus de l'IA) n'initialise pas pygame
+TITLE_SIZE = 75
+BUTTON_SIZE = 25
+TEXT_SIZE = 20
 
 # Couleurs
 COLORS = {
@@ -30,16 +31,13 @@ class Button:
         self.hover_color = hover_color
         self.current_color = color
         self.is_hovered = False
-        try:
-            self.click_sound = pygame.mixer.Sound('assets/mouse-click-sound.mp3')
-        except pygame.error:
-            self.click_sound = None
+        self.click_sound = sound('mouse-click-sound.mp3')
 
     def draw(self, surface):
         color = self.hover_color if self.is_hovered else self.color
         pygame.draw.rect(surface, color, self.rect, border_radius=10)
         pygame.draw.rect(surface, COLORS["text_dark"], self.rect, 2, border_radius=10)
-        text_surf = button_font.render(self.text, True, COLORS["text"])
+        text_surf = render(get_font(BUTTON_SIZE), self.text, COLORS["text"])
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
 
@@ -61,20 +59,19 @@ class DifficultyMenu:
             Button(WIDTH//2 - 150, 350, 300, 70, "NO", COLORS["primary"], (52, 152, 219)),
             Button(WIDTH//2 - 150, 450, 300, 70, "BACK", COLORS["accent"], (192, 57, 43))
         ]
-        self.background = pygame.image.load("assets/background.jpg")
-        self.background = pygame.transform.scale(self.background, (WIDTH, HEIGHT))
+        self.background = image("background.jpg", (WIDTH, HEIGHT))
 
     def draw(self, surface):
         surface.blit(self.background, (0, 0))
-        title_surf = title_font.render("Need help?", True, COLORS["title"])
+        title_surf = render(get_font(TITLE_SIZE), "Need help?", COLORS["title"])
         title_rect = title_surf.get_rect(midtop=(WIDTH//2, 100))
         surface.blit(title_surf, title_rect)
 
-        beginner_desc_surf = text_font.render("", True, COLORS["text"])
+        beginner_desc_surf = render(get_font(TEXT_SIZE), "", COLORS["text"])
         beginner_desc_rect = beginner_desc_surf.get_rect(midtop=(WIDTH//2, 300))
         surface.blit(beginner_desc_surf, beginner_desc_rect)
 
-        master_desc_surf = text_font.render("", True, COLORS["text"])
+        master_desc_surf = render(get_font(TEXT_SIZE), "", COLORS["text"])
         master_desc_rect = master_desc_surf.get_rect(midtop=(WIDTH//2, 400))
         surface.blit(master_desc_surf, master_desc_rect)
 
@@ -82,12 +79,12 @@ class DifficultyMenu:
             button.draw(surface)
 
     def run(self):
-        clock = pygame.time.Clock()
+        loop = FrameLoop()
         while True:
             mouse_pos = pygame.mouse.get_pos()
             mouse_click = False
             
-            for event in pygame.event.get():
+            for event in loop.events():
                 if event.type == pygame.QUIT:
                     return "quit", False
                 if event.type == pygame.MOUSEBUTTONDOWN:
@@ -105,7 +102,6 @@ class DifficultyMenu:
             
             self.draw(self.win)
             pygame.display.flip()
-            clock.tick(60)
 
 class AIDifficultyMenu:
     def __init__(self, win):
@@ -116,12 +112,11 @@ class AIDifficultyMenu:
             Button(WIDTH//2 - 150, 450, 300, 70, "HARD", COLORS["accent"], (192, 57, 43)),
             Button(WIDTH//2 - 150, 550, 300, 70, "BACK", COLORS["text_dark"], (74, 92, 110))
         ]
-        self.background = pygame.image.load("assets/background.jpg")
-        self.background = pygame.transform.scale(self.background, (WIDTH, HEIGHT))
+        self.background = image("background.jpg", (WIDTH, HEIGHT))
 
     def draw(self, surface):
         surface.blit(self.background, (0, 0))
-        title_surf = title_font.render("Difficulty", True, COLORS["title"])  # Utiliser COLORS["title"]
+        title_surf = render(get_font(TITLE_SIZE), "Difficulty", COLORS["title"])  # Utiliser COLORS["title"]
         title_rect = title_surf.get_rect(midtop=(WIDTH//2, 100))
         surface.blit(title_surf, title_rect)
 
@@ -129,12 +124,12 @@ class AIDifficultyMenu:
             button.draw(surface)
 
     def run(self):
-        clock = pygame.time.Clock()
+        loop = FrameLoop()
         while True:
             mouse_pos = pygame.mouse.get_pos()
             mouse_click = False
             
-            for event in pygame.event.get():
+            for event in loop.events():
                 if event.type == pygame.QUIT:
                     return "quit"
                 if event.type == pygame.MOUSEBUTTONDOWN:
@@ -154,7 +149,6 @@ class AIDifficultyMenu:
             
             self.draw(self.win)
             pygame.display.flip()
-            clock.tick(60)
 
 class GameModeMenu:
     def __init__(self, win):
@@ -164,26 +158,25 @@ class GameModeMenu:
             Button(WIDTH//2 - 150, 350, 300, 70, "VS AI", COLORS["secondary"], (46, 204, 113)),
             Button(WIDTH//2 - 150, 450, 300, 70, "BACK", COLORS["accent"], (192, 57, 43))
         ]
-        self.background = pygame.image.load("assets/background.jpg")
-        self.background = pygame.transform.scale(self.background, (WIDTH, HEIGHT))
+        self.background = image("background.jpg", (WIDTH, HEIGHT))
         self.difficulty_menu = DifficultyMenu(win)
         self.ai_difficulty_menu = AIDifficultyMenu(win)
 
     def draw(self, surface):
         surface.blit(self.background, (0, 0))
-        title_surf = title_font.render("LOCAL PLAY", True, COLORS["title"])
+        title_surf = render(get_font(TITLE_SIZE), "LOCAL PLAY", COLORS["title"])
         title_rect = title_surf.get_rect(midtop=(WIDTH//2, 100))
         surface.blit(title_surf, title_rect)
         for button in self.buttons:
             button.draw(surface)
 
     def run(self):
-        clock = pygame.time.Clock()
+        loop = FrameLoop()
         while True:
             mouse_pos = pygame.mouse.get_pos()
             mouse_click = False
             
-            for event in pygame.event.get():
+            for event in loop.events():
                 if event.type == pygame.QUIT:
                     return "quit", None, None, False
                 if event.type == pygame.MOUSEBUTTONDOWN:
@@ -216,7 +209,6 @@ class GameModeMenu:
             
             self.draw(self.win)
             pygame.display.flip()
-            clock.tick(60)
 
 class PauseMenu:
     def __init__(self, win, background):
@@ -247,7 +239,7 @@ class PauseMenu:
         box = pygame.Rect(self.box_x, self.box_y, self.box_width, self.box_height)
         pygame.draw.rect(surface, COLORS["background"], box, border_radius=20)
         
-        title_surf = title_font.render("PAUSED", True, COLORS["text"])  # Conserver COLORS["text"]
+        title_surf = render(get_font(TITLE_SIZE), "PAUSED", COLORS["text"])  # Conserver COLORS["text"]
         title_rect = title_surf.get_rect(midtop=(self.box_x + self.box_width // 2, self.box_y + 20))
         surface.blit(title_surf, title_rect)
 
@@ -255,12 +247,12 @@ class PauseMenu:
             button.draw(surface)
 
     def run(self):
-        clock = pygame.time.Clock()
+        loop = FrameLoop()
         while True:
             mouse_pos = pygame.mouse.get_pos()
             mouse_click = False
             
-            for event in pygame.event.get():
+            for event in loop.events():
                 if event.type == pygame.QUIT:
                     return "quit"
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
@@ -280,13 +272,11 @@ class PauseMenu:
             
             self.draw(self.win)
             pygame.display.flip()
-            clock.tick(60)
 
 class OnlineMenu:
     def __init__(self, win):
         self.win = win
-        self.background = pygame.image.load("assets/background.jpg")
-        self.background = pygame.transform.scale(self.background, (WIDTH, HEIGHT))
+        self.background = image("background.jpg", (WIDTH, HEIGHT))
         
         # Input box for player name
         self.name_input = ""
@@ -315,11 +305,16 @@ class OnlineMenu:
         self.error_message = ""
         self.error_timer = 0
         
-        try:
-            self.click_sound = pygame.mixer.Sound('assets/mouse-click-sound.mp3')
-        except pygame.error:
-            self.click_sound = None
+        self.click_sound = sound('mouse-click-sound.mp3')
     
+    def idle_timeout(self):
+        """Time the menu may sleep: until the error message is due to go, at most"""
+        if self.error_message:
+            left = 5000 - (pygame.time.get_ticks() - self.error_timer)
+            if left > 0:
+                return left
+        return IDLE_TIMEOUT
+
     def handle_network_message(self, message):
         """Handle incoming network messages"""
         if message["type"] == "players_update":
@@ -347,7 +342,7 @@ class OnlineMenu:
         """Draw the waiting room screen"""
         surface.blit(self.background, (0, 0))
         
-        title_surf = title_font.render("WAITING ROOM", True, COLORS["title"])
+        title_surf = render(get_font(TITLE_SIZE), "WAITING ROOM", COLORS["title"])
         title_rect = title_surf.get_rect(midtop=(WIDTH//2, 100))
         surface.blit(title_surf, title_rect)
         
@@ -359,14 +354,14 @@ class OnlineMenu:
             else:
                 player_text = f"Player {player_id}: {player_name}"
                 
-            text_surf = button_font.render(player_text, True, COLORS["text"])
+            text_surf = render(get_font(BUTTON_SIZE), player_text, COLORS["text"])
             text_rect = text_surf.get_rect(midtop=(WIDTH//2, y_offset))
             surface.blit(text_surf, text_rect)
             y_offset += 60
         
         # Draw status message
         if len(self.players) < 2:
-            status_surf = button_font.render("Waiting for another player...", True, COLORS["accent"])
+            status_surf = render(get_font(BUTTON_SIZE), "Waiting for another player...", COLORS["accent"])
             status_rect = status_surf.get_rect(midtop=(WIDTH//2, y_offset + 40))
             surface.blit(status_surf, status_rect)
         
@@ -385,35 +380,35 @@ class OnlineMenu:
         """Draw the connection screen"""
         surface.blit(self.background, (0, 0))
         
-        title_surf = title_font.render("PLAY ONLINE", True, COLORS["title"])
+        title_surf = render(get_font(TITLE_SIZE), "PLAY ONLINE", COLORS["title"])
         title_rect = title_surf.get_rect(midtop=(WIDTH//2, 100))
         surface.blit(title_surf, title_rect)
         
         # Draw name input prompt
-        name_prompt = text_font.render("Enter your name:", True, COLORS["text"])
+        name_prompt = render(get_font(TEXT_SIZE), "Enter your name:", COLORS["text"])
         name_prompt_rect = name_prompt.get_rect(midtop=(WIDTH//2, 250))
         surface.blit(name_prompt, name_prompt_rect)
         
         # Draw name input box
         pygame.draw.rect(surface, COLORS["text"] if self.input_active else COLORS["text_dark"], 
                         self.input_box, 2, border_radius=10)
-        name_surf = text_font.render(self.name_input, True, COLORS["text"])
+        name_surf = render(get_font(TEXT_SIZE), self.name_input, COLORS["text"])
         surface.blit(name_surf, (self.input_box.x + 10, self.input_box.y + 15))
         
         # Draw server IP prompt
-        server_prompt = text_font.render("Server IP (default: localhost):", True, COLORS["text"])
+        server_prompt = render(get_font(TEXT_SIZE), "Server IP (default: localhost):", COLORS["text"])
         server_prompt_rect = server_prompt.get_rect(midtop=(WIDTH//2, 370))
         surface.blit(server_prompt, server_prompt_rect)
         
         # Draw server IP input box
         pygame.draw.rect(surface, COLORS["text"] if self.server_ip_input_active else COLORS["text_dark"], 
                         self.server_ip_box, 2, border_radius=10)
-        server_surf = text_font.render(self.server_ip, True, COLORS["text"])
+        server_surf = render(get_font(TEXT_SIZE), self.server_ip, COLORS["text"])
         surface.blit(server_surf, (self.server_ip_box.x + 10, self.server_ip_box.y + 15))
         
         # Draw error message if any
         if self.error_message and pygame.time.get_ticks() - self.error_timer < 5000:  # Show for 5 seconds
-            error_surf = text_font.render(self.error_message, True, COLORS["accent"])
+            error_surf = render(get_font(TEXT_SIZE), self.error_message, COLORS["accent"])
             error_rect = error_surf.get_rect(midtop=(WIDTH//2, 460))
             surface.blit(error_surf, error_rect)
         
@@ -425,13 +420,13 @@ class OnlineMenu:
         """Run the online menu loop"""
         from classes.network import Network
         
-        clock = pygame.time.Clock()
+        loop = FrameLoop()
         
         while True:
             mouse_pos = pygame.mouse.get_pos()
             mouse_click = False
             
-            for event in pygame.event.get():
+            for event in loop.events(self.idle_timeout()):
                 if event.type == pygame.QUIT:
                     if self.network and self.connected:
                         self.network.disconnect()
@@ -537,7 +532,6 @@ class OnlineMenu:
                     return "online", self.name_input, self.network, True  # Always enable visual help in online mode
             
             pygame.display.flip()
-            clock.tick(60)
 
 class MainMenu:
     def __init__(self, win):
@@ -561,8 +555,7 @@ class MainMenu:
             "Youssef Boulafra",
             "Mohamed Aymane Bouhmouch"
         ]
-        self.background = pygame.image.load("assets/background.jpg")
-        self.background = pygame.transform.scale(self.background, (WIDTH, HEIGHT))
+        self.background = image("background.jpg", (WIDTH, HEIGHT))
 
     def draw_about(self, surface):
         surface.blit(self.background, (0, 0))
@@ -575,7 +568,7 @@ class MainMenu:
         box = pygame.Rect(WIDTH//2 - 250, HEIGHT//2 - box_height//2, 500, box_height)
         pygame.draw.rect(surface, COLORS["background"], box, border_radius=20)
         
-        title_surf = title_font.render("ABOUT", True, COLORS["text"])
+        title_surf = render(get_font(TITLE_SIZE), "ABOUT", COLORS["text"])
         title_rect = title_surf.get_rect(midtop=(WIDTH//2, HEIGHT//2 - box_height//2 + 30))
         surface.blit(title_surf, title_rect)
         
@@ -584,7 +577,7 @@ class MainMenu:
         
         for i, line in enumerate(self.about_text):
             if line:
-                text_surf = text_font.render(line, True, COLORS["text"])
+                text_surf = render(get_font(TEXT_SIZE), line, COLORS["text"])
                 text_rect = text_surf.get_rect(midtop=(WIDTH//2, start_y + i * line_height))
                 surface.blit(text_surf, text_rect)
         
@@ -599,7 +592,7 @@ class MainMenu:
             back_button = self.draw_about(surface)
             return back_button
         else:
-            title_surf = title_font.render("CHECKERS", True, COLORS["title"])
+            title_surf = render(get_font(TITLE_SIZE), "CHECKERS", COLORS["title"])
             title_rect = title_surf.get_rect(midtop=(WIDTH//2, 100))
             surface.blit(title_surf, title_rect)
 
@@ -608,12 +601,12 @@ class MainMenu:
             return None
 
     def run(self):
-        clock = pygame.time.Clock()
+        loop = FrameLoop()
         while True:
             mouse_pos = pygame.mouse.get_pos()
             mouse_click = False
             
-            for event in pygame.event.get():
+            for event in loop.events():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     return "quit", None, None, False
@@ -656,5 +649,4 @@ class MainMenu:
                             return "quit", None, None, False
             
             self.draw(self.win)
-            pygame.display.flip()
-            clock.tick(60)
\ No newline at end of file
+            pygame.display.flip()
\ No newline at end of file
@@ -3,6 +3,8 @@ import pickle
 import threading
 import time
 
+from .loop import NETWORK_EVENT, notify
+
 class Network:
     def __init__(self):
         self.client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -116,6 +118,8 @@ class Network:
                     result = self.callback(message)
                     if result == "start_game":
                         print("[NETWORK] Detected game start from callback")
+                # Wake the game or menu loop if it is idle
+                notify(NETWORK_EVENT)
                     
             except Exception as e:
                 print(f"[NETWORK] Error receiving data: {e}")
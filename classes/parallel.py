@@ -0,0 +1,168 @@
+import concurrent.futures
+import multiprocessing
+import os
+
+from .ai import AIPlayer, SearchTimeout
+from .book import BOOK_PATH
+from .rules import Position
+from .stats import SearchStats
+from .tt import EXACT, SharedTranspositionTable
+
+# Per-process state of the pool workers, set up by _init_worker
+_worker = None
+_generation = None
+# (generation, depth) of the root iteration the worker last searched for
+_iteration = None
+
+# How often the root waits wake up to look at the clock and should_stop
+POLL_INTERVAL = 0.02
+
+
+def _init_worker(color, difficulty, tt_name, tt_policy, generation):
+    global _worker, _generation
+    _worker = AIPlayer(color, difficulty, tt_megabytes=0, book_path=None)
+    if tt_name is not None:
+        _worker.tt = SharedTranspositionTable.attach(tt_name, tt_policy)
+    _generation = generation
+
+
+def _search_move(snapshot, move, depth, alpha, generation, collect_stats=False):
+    """
+    Score of root ``move`` searched to ``depth`` in a pool worker, from the
+    root side's point of view, the number of nodes it took and, with
+    ``collect_stats``, its SearchStats as a dict. Scores at or below
+    ``alpha`` are upper bounds. The search is abandoned (returning None)
+    once the shared generation moves on.
+    """
+    global _iteration
+    if _generation.value != generation:
+        return None, 0, None
+    # Reset the move ordering tables as AIPlayer.search does: history once
+    # per search, killers (kept by depth) once per iteration
+    if _iteration is None or _iteration[0] != generation:
+        _worker.history = {}
+    if _iteration != (generation, depth):
+        _worker.killers = {}
+        _iteration = (generation, depth)
+    _worker.nodes = 0
+    _worker.should_stop = lambda: _generation.value != generation
+    _worker.stats = SearchStats() if collect_stats else None
+    # Plies are counted from the real root, one move above this search
+    _worker.root_depth = depth
+    position = Position(*snapshot)
+    position.apply(move)
+    try:
+        score = -_worker.minimax(position, depth - 1, float('-inf'), -alpha)[0]
+    except SearchTimeout:
+        score = None
+    stats = _worker.stats.as_dict() if collect_stats else None
+    return score, _worker.nodes, stats
+
+
+class ParallelAIPlayer(AIPlayer):
+    """
+    AIPlayer that splits the root of every iteration over a process pool.
+
+    The first root move is searched here to get a bound; the others are then
+    searched by ``workers`` processes with that bound as alpha. Results are
+    read back in move order and only a strictly better score replaces the
+    best move, so the move and score match the serial search at equal depth.
+    All processes share one SharedTranspositionTable, sized here once.
+    """
+
+    def __init__(self, color, difficulty="medium", tt_megabytes=16, tt_policy="depth", workers=None,
+                 book_path=BOOK_PATH):
+        super().__init__(color, difficulty, tt_megabytes=0, book_path=book_path)
+        if tt_megabytes:
+            self.tt = SharedTranspositionTable(tt_megabytes, tt_policy)
+        self.workers = workers or os.cpu_count() or 1
+        self.difficulty_name = difficulty
+        self.pool = None
+        self.generation = None
+
+    def _start_pool(self):
+        context = multiprocessing.get_context("spawn")
+        self.generation = context.RawValue("q", 1)
+        self.pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context, initializer=_init_worker,
+            initargs=(self.color, self.difficulty_name,
+                      self.tt.name if self.tt is not None else None,
+                      self.tt.policy if self.tt is not None else None, self.generation))
+
+    def search(self, position, budget=None):
+        if self.pool is None:
+            self._start_pool()
+        self.generation.value += 1
+        try:
+            return super().search(position, budget)
+        finally:
+            # Stop any worker still busy with this search
+            self.generation.value += 1
+
+    def _search_root(self, position, depth, alpha=float('-inf'), beta=float('inf')):
+        valid_moves = position.moves()
+        if depth <= 1 or len(valid_moves) < 2 or position.winner() is not None:
+            return self.minimax(position, depth, alpha, beta)
+        # The split root always finds the exact score, whatever the window
+        self.nodes += 1
+
+        # Same root ordering as minimax: killers and history, then the stored
+        # best move and the PV move in front
+        tt_move = None
+        if self.tt is not None:
+            entry = self.tt.probe(position.hash)
+            if entry is not None:
+                tt_depth, tt_score, tt_bound, tt_move = entry
+                if tt_depth >= depth and tt_bound == EXACT:
+                    return tt_score, tt_move
+        if self.heuristics:
+            self.order_moves(valid_moves, depth)
+        for first in (tt_move, self.pv_moves.get(position.hash)):
+            if first is not None and first in valid_moves:
+                valid_moves.remove(first)
+                valid_moves.insert(0, first)
+
+        best_move = valid_moves[0]
+        saved = position.apply(best_move)
+        best_score = -self.minimax(position, depth - 1, float('-inf'), float('inf'))[0]
+        position.restore(saved)
+
+        snapshot = position.snapshot()
+        generation = self.generation.value
+        collect_stats = self.stats is not None
+        futures = [self.pool.submit(_search_move, snapshot, move, depth, best_score, generation, collect_stats)
+                   for move in valid_moves[1:]]
+        try:
+            for move, future in zip(valid_moves[1:], futures):
+                while True:
+                    try:
+                        score, nodes, stats = future.result(timeout=POLL_INTERVAL)
+                        break
+                    except concurrent.futures.TimeoutError:
+                        if self._out_of_time():
+                            raise SearchTimeout
+                self.nodes += nodes
+                if stats is not None:
+                    self.stats.merge(stats)
+                if score is None:
+                    raise SearchTimeout
+                if score > best_score:
+                    best_score, best_move = score, move
+        except SearchTimeout:
+            self.generation.value += 1
+            for future in futures:
+                future.cancel()
+            raise
+
+        if self.tt is not None:
+            self.tt.store(position.hash, depth, best_score, EXACT, best_move)
+        return best_score, best_move
+
+    def close(self):
+        if self.pool is not None:
+            self.generation.value += 1
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+        if self.tt is not None:
+            self.tt.close()
+            self.tt = None
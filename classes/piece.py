@@ -1,9 +1,18 @@
-import pygame
-from .constants import PIECE_DARK, PIECE_LIGHT, SQUARE_SIZE, GREY, CROWN, WHITE, WIDTH, HEIGHT
+from .constants import PIECE_DARK, PIECE_LIGHT, SQUARE_SIZE, GREY, WHITE, WIDTH, HEIGHT
 
-BLACK_PIECE_IMG = pygame.transform.scale(pygame.image.load("assets/black_piece.png"), (SQUARE_SIZE - 10, SQUARE_SIZE - 10))
-WHITE_PIECE_IMG = pygame.transform.scale(pygame.image.load("assets/white_piece.png"), (SQUARE_SIZE - 10, SQUARE_SIZE - 10))
-CROWN = pygame.transform.scale(pygame.image.load("assets/crown.png"), (32, 18))
+# Piece images are fetched from the asset cache on the first draw so that
+# importing the module (e.g. from the rules engine tools) needs neither
+# pygame nor the image loaders.
+IMAGES = {}
+
+
+def load_images():
+    if not IMAGES:
+        from .assets import image
+        IMAGES["black"] = image("black_piece.png", (SQUARE_SIZE - 10, SQUARE_SIZE - 10), alpha=True)
+        IMAGES["white"] = image("white_piece.png", (SQUARE_SIZE - 10, SQUARE_SIZE - 10), alpha=True)
+        IMAGES["crown"] = image("crown.png", (32, 18), alpha=True)
+    return IMAGES
 
 
 
@@ -40,16 +49,18 @@ class Piece:
     #     if self.king:
     #         win.blit(CROWN, (self.x - CROWN.get_width() // 2, self.y - CROWN.get_height() // 2))
     def draw(self, win):
+        images = load_images()
         if self.color == PIECE_DARK:  # black player
-            image = BLACK_PIECE_IMG
+            image = images["black"]
         else:  # red player (using white piece image)
-            image = WHITE_PIECE_IMG
+            image = images["white"]
 
         rect = image.get_rect(center=(self.x, self.y))
         win.blit(image, rect)
 
         if self.king:
-            win.blit(CROWN, (self.x - CROWN.get_width() // 2, self.y - CROWN.get_height() // 2))
+            crown = images["crown"]
+            win.blit(crown, (self.x - crown.get_width() // 2, self.y - crown.get_height() // 2))
 
 
     def move(self, row, col):
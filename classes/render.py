@@ -0,0 +1,71 @@
+import pygame
+
+
+class DirtyRenderer:
+    """
+    Redraws only the parts of the window that changed since the last frame.
+
+    A frame is a static background surface covering the window and a list of
+    layers ``(name, key, rect, draw)`` in drawing order. ``key`` is any value
+    that changes whenever the layer would look different and ``rect`` bounds
+    what ``draw(win)`` paints. A layer whose key or rect changed, or that
+    appeared or went away, dirties its old and new rects. Each dirty rect is
+    restored from the background and every layer crossing it is drawn again,
+    clipped to it and in order, so overlapping layers keep their stacking.
+    Only the dirty rects are passed to pygame.display.update.
+    """
+
+    def __init__(self):
+        # name -> (key, rect) of the layers of the last frame
+        self.layers = {}
+        self.full = True
+        # Rects pushed to the display by the last frame
+        self.last_rects = []
+
+    def invalidate(self):
+        """Repaint the whole window on the next frame, e.g. after a menu drew over it"""
+        self.full = True
+
+    def dirty(self, win, layers):
+        if self.full:
+            return [win.get_rect()]
+        rects = []
+        for name, key, rect, _ in layers:
+            previous = self.layers.pop(name, None)
+            if previous is None:
+                rects.append(rect)
+            elif previous[0] != key or previous[1] != rect:
+                rects.append(previous[1].union(rect))
+        # Layers that are gone leave their background behind
+        rects.extend(rect for _, rect in self.layers.values())
+        return merge_rects(rects)
+
+    def frame(self, win, background, layers):
+        """Draw one frame and return the rects that were pushed to the display"""
+        rects = self.dirty(win, layers)
+        self.layers = {name: (key, rect) for name, key, rect, _ in layers}
+        self.full = False
+        for area in rects:
+            win.set_clip(area)
+            win.blit(background, area, area)
+            for _, _, rect, draw in layers:
+                if rect.colliderect(area):
+                    draw(win)
+        win.set_clip(None)
+        if rects:
+            pygame.display.update(rects)
+        self.last_rects = rects
+        return rects
+
+
+def merge_rects(rects):
+    """Join overlapping rects, so that no pixel is drawn twice in a frame"""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
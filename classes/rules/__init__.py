@@ -0,0 +1,10 @@
+"""
+Pure-Python checkers rules: position, move generation, winner detection and
+state serialisation. Nothing in this package imports pygame, so the server,
+the AI workers and the tools can use it without a display.
+"""
+from .bitboard import (
+    DARK, LIGHT, COLORS, VALID, PROMOTION, ROW_MASKS, Position,
+    SQUARE_SCORES, bit_of, square_of, iter_bits, side_of, pack_move, unpack_move, full_score,
+)
+from .zobrist import full_hash
@@ -0,0 +1,488 @@
+from ..constants import ROWS, COLS, PIECE_DARK, PIECE_LIGHT
+from .zobrist import PIECE_KEYS, SIDE_KEY, mask_keys, full_hash
+
+# Sides are plain ints inside the engine so they can index lists and be
+# flipped with ``side ^ 1``; COLORS maps them back to the UI colors.
+DARK, LIGHT = 0, 1
+COLORS = (PIECE_DARK, PIECE_LIGHT)
+
+# The 32 playable squares are packed into a 35-bit integer with an unused
+# "ghost" bit after every second row (bits 8, 17 and 26).  With that gap a
+# diagonal step is always the same shift: 4 or 5 bits towards row 7 and 4 or
+# 5 bits towards row 0.  A step that would leave the board lands on a ghost
+# bit or outside VALID and is masked away.
+UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT = -5, -4, 4, 5
+UP = (UP_LEFT, UP_RIGHT)
+DOWN = (DOWN_LEFT, DOWN_RIGHT)
+ALL_DIRECTIONS = UP + DOWN
+
+SQUARE_BIT = {}  # (row, col) -> bit index
+BIT_SQUARE = {}  # bit index -> (row, col)
+ROW_MASKS = [0] * ROWS
+for _row in range(ROWS):
+    for _col in range(COLS):
+        if (_row + _col) % 2 == 1:
+            _bit = _row * 4 + _col // 2 + _row // 2
+            SQUARE_BIT[(_row, _col)] = _bit
+            BIT_SQUARE[_bit] = (_row, _col)
+            ROW_MASKS[_row] |= 1 << _bit
+
+VALID = sum(ROW_MASKS)
+PROMOTION = ROW_MASKS[0] | ROW_MASKS[ROWS - 1]
+START_LIGHT = ROW_MASKS[0] | ROW_MASKS[1] | ROW_MASKS[2]
+START_DARK = ROW_MASKS[5] | ROW_MASKS[6] | ROW_MASKS[7]
+
+
+
+def shift(mask, direction):
+    return mask << direction if direction > 0 else mask >> -direction
+
+
+def bit_of(row, col):
+    return 1 << SQUARE_BIT[(row, col)]
+
+
+def square_of(mask):
+    return BIT_SQUARE[mask.bit_length() - 1]
+
+
+def iter_bits(mask):
+    while mask:
+        bit = mask & -mask
+        yield bit
+        mask ^= bit
+
+
+def side_of(color):
+    return DARK if color == PIECE_DARK else LIGHT
+
+
+# Squares that earn positional bonuses in the static evaluation
+CENTER = bit_of(3, 4) | bit_of(4, 3)
+EDGES = 0
+for _row in range(ROWS):
+    EDGES |= bit_of(_row, 0) if _row % 2 else bit_of(_row, 7)
+# A piece standing on its own promotion row (dark reaches row 0, light row 7)
+FAR_ROW = (ROW_MASKS[0], ROW_MASKS[ROWS - 1])
+
+
+def _square_score(side, king, bit):
+    score = 40 if king else 10
+    score += 5 * bool(bit & CENTER) + 3 * bool(bit & EDGES) + 10 * bool(bit & FAR_ROW[side])
+    return score if side == DARK else -score
+
+
+# The material and positional part of the evaluation is kept up to date like
+# the hash: SQUARE_SCORES[side][is_king] maps a square to the worth of such a
+# piece there for dark (negative for light), and Position.score is the sum
+SQUARE_SCORES = tuple(
+    tuple({bit: _square_score(side, king, bit) for bit in iter_bits(VALID)} for king in (False, True))
+    for side in (DARK, LIGHT)
+)
+
+
+# make_move keeps (dark, light, kings, hash, score) per ply on a flat list,
+# grown by UNDO_PLIES records at a time; the side to move is just flipped back
+UNDO_RECORD = 5
+UNDO_PLIES = 64
+
+
+def full_score(dark, light, kings):
+    """Score computed from scratch; positions keep theirs up to date incrementally"""
+    score = 0
+    for side, pieces in ((DARK, dark), (LIGHT, light)):
+        for bit in iter_bits(pieces):
+            score += SQUARE_SCORES[side][1 if bit & kings else 0][bit]
+    return score
+
+
+# Packed moves are 64-bit ints for fixed-size records (shared tables, books):
+# the from and to bit indexes (6 bits each) above the 35-bit captured mask,
+# with bit 63 set so that 0 can stand for "no move".
+CAPTURED_BITS = 35
+MOVE_FLAG = 1 << 63
+
+
+def pack_move(move):
+    if move is None:
+        return 0
+    frm, to, captured = move
+    return (MOVE_FLAG | (frm.bit_length() - 1) << CAPTURED_BITS + 6
+            | (to.bit_length() - 1) << CAPTURED_BITS | captured)
+
+
+def unpack_move(word):
+    if not word:
+        return None
+    return (1 << (word >> CAPTURED_BITS + 6 & 63), 1 << (word >> CAPTURED_BITS & 63),
+            word & (1 << CAPTURED_BITS) - 1)
+
+
+class Position:
+    """
+    Checkers position as three bitmasks (dark, light, kings) plus the side to move.
+
+    Moves are ``(from_mask, to_mask, captured_mask)`` tuples; a capture is
+    the whole chain, with every piece it takes in ``captured_mask`` (the
+    squares in between come from jump_path). ``hash`` is the 64-bit Zobrist
+    key of the position and ``score`` the sum of its SQUARE_SCORES, both
+    kept up to date by every method that changes it.
+    """
+    __slots__ = ("pieces", "kings", "turn", "hash", "score", "undo", "undo_top")
+
+    def __init__(self, dark=START_DARK, light=START_LIGHT, kings=0, turn=DARK, hash=None, score=None):
+        self.pieces = [dark, light]
+        self.kings = kings
+        self.turn = turn
+        self.hash = full_hash(dark, light, kings, turn) if hash is None else hash
+        self.score = full_score(dark, light, kings) if score is None else score
+        # Undo stack of make_move, allocated by the first call
+        self.undo = None
+        self.undo_top = 0
+
+    @classmethod
+    def from_grid(cls, grid, color=PIECE_DARK):
+        """Build a position from a ROWS x COLS grid of Piece objects (0 for empty)"""
+        dark = light = kings = 0
+        for row in range(ROWS):
+            for col in range(COLS):
+                piece = grid[row][col]
+                if piece == 0:
+                    continue
+                bit = bit_of(row, col)
+                if piece.color == PIECE_DARK:
+                    dark |= bit
+                else:
+                    light |= bit
+                if piece.king:
+                    kings |= bit
+        return cls(dark, light, kings, side_of(color))
+
+    @classmethod
+    def from_state(cls, state, color=PIECE_DARK):
+        """Build a position from the dict produced by Board.get_board_state"""
+        dark = light = kings = 0
+        for piece_data in state["board_pieces"]:
+            bit = bit_of(piece_data["row"], piece_data["col"])
+            if piece_data["color"] == PIECE_DARK:
+                dark |= bit
+            else:
+                light |= bit
+            if piece_data["king"]:
+                kings |= bit
+        return cls(dark, light, kings, side_of(color))
+
+    def to_state(self):
+        """Serializable board state in the format used for network transmission"""
+        state = {
+            "board_pieces": [],
+            "red_left": self.count(LIGHT),
+            "white_left": self.count(DARK),
+            "red_kings": self.king_count(LIGHT),
+            "white_kings": self.king_count(DARK)
+        }
+        for bit in iter_bits(self.pieces[DARK] | self.pieces[LIGHT]):
+            row, col = square_of(bit)
+            state["board_pieces"].append({
+                "row": row,
+                "col": col,
+                "color": PIECE_DARK if bit & self.pieces[DARK] else PIECE_LIGHT,
+                "king": bool(bit & self.kings)
+            })
+        return state
+
+    def copy(self):
+        return Position(self.pieces[DARK], self.pieces[LIGHT], self.kings, self.turn, self.hash, self.score)
+
+    def snapshot(self):
+        """Compact picklable form, ``Position(*position.snapshot())`` rebuilds it"""
+        return (self.pieces[DARK], self.pieces[LIGHT], self.kings, self.turn)
+
+    def count(self, side):
+        return self.pieces[side].bit_count()
+
+    def king_count(self, side):
+        return (self.pieces[side] & self.kings).bit_count()
+
+    def winner(self):
+        if not self.pieces[LIGHT]:
+            return PIECE_DARK
+        elif not self.pieces[DARK]:
+            return PIECE_LIGHT
+        return None
+
+    def side_at(self, bit):
+        """DARK or LIGHT for an occupied square, None for an empty one"""
+        if bit & self.pieces[DARK]:
+            return DARK
+        if bit & self.pieces[LIGHT]:
+            return LIGHT
+        return None
+
+    def set_turn(self, side):
+        if side != self.turn:
+            self.turn = side
+            self.hash ^= SIDE_KEY
+
+    def move_piece(self, frm, to):
+        """
+        Move the piece on ``frm`` to the empty square ``to``, crowning it on the
+        back rows. ``to`` may be ``frm`` itself, at the end of a king's chain
+        that went round; the piece then stays.
+        """
+        if frm == to:
+            return
+        side = self.side_at(frm)
+        keys = PIECE_KEYS[side]
+        scores = SQUARE_SCORES[side]
+        self.pieces[side] ^= frm | to
+        if self.kings & frm:
+            self.kings ^= frm | to
+            self.hash ^= keys[1][frm] ^ keys[1][to]
+            self.score += scores[1][to] - scores[1][frm]
+        else:
+            self.hash ^= keys[0][frm] ^ keys[0][to]
+            self.score += scores[0][to] - scores[0][frm]
+            if to & PROMOTION:
+                self.kings |= to
+                self.hash ^= keys[0][to] ^ keys[1][to]
+                self.score += scores[1][to] - scores[0][to]
+
+    def remove(self, mask):
+        kings = self.kings & mask
+        for side in (DARK, LIGHT):
+            self.hash ^= (mask_keys(side, False, self.pieces[side] & mask & ~kings)
+                          ^ mask_keys(side, True, self.pieces[side] & kings))
+            for bit in iter_bits(self.pieces[side] & mask):
+                self.score -= SQUARE_SCORES[side][1 if bit & kings else 0][bit]
+        self.pieces[DARK] &= ~mask
+        self.pieces[LIGHT] &= ~mask
+        self.kings &= ~mask
+
+    def piece_moves(self, bit):
+        """
+        Legal moves of the piece on ``bit`` as {to_mask: captured_mask}. When
+        two capture chains end on the same square the one taking more wins.
+        """
+        moves = {}
+        for frm, to, captured in self.moves(self.side_at(bit)):
+            if frm == bit and (to not in moves or captured.bit_count() > moves[to].bit_count()):
+                moves[to] = captured
+        return moves
+
+    def _jumps(self, origin, bit, king, forward, opp, empty, captured, captures):
+        """
+        Extend the chain of the piece that left ``origin`` and stands on ``bit``
+        having taken ``captured``. Taken pieces stay on the board until the
+        move ends, so they can be neither jumped again nor landed on; a man
+        reaching the back row is crowned and stops there.
+        """
+        extended = False
+        for direction in (ALL_DIRECTIONS if king else forward):
+            over = shift(bit, direction) & opp & ~captured
+            if over:
+                landing = shift(over, direction) & empty
+                if landing:
+                    extended = True
+                    if not king and landing & PROMOTION:
+                        captures.append((origin, landing, captured | over))
+                    else:
+                        self._jumps(origin, landing, king, forward, opp, empty, captured | over, captures)
+        if not extended and captured:
+            captures.append((origin, bit, captured))
+
+    def _movers(self, side):
+        own = self.pieces[side]
+        kings = own & self.kings
+        if side == DARK:
+            return own, kings
+        return kings, own
+
+    def _single_jumps(self, side):
+        """Masks of the pieces of ``side`` that can jump up-left, up-right, down-left and down-right"""
+        own = self.pieces[side]
+        opp = self.pieces[side ^ 1]
+        up, down = self._movers(side)
+        empty = VALID & ~(own | opp)
+        return ((((empty << 5) & opp) << 5) & up, (((empty << 4) & opp) << 4) & up,
+                (((empty >> 4) & opp) >> 4) & down, (((empty >> 5) & opp) >> 5) & down)
+
+    def captures(self, side=None):
+        """
+        Capture moves of ``side`` (default: side to move), each one a whole
+        chain jumped to the end, most pieces taken first.
+        """
+        if side is None:
+            side = self.turn
+        up_left, up_right, down_left, down_right = self._single_jumps(side)
+        jumpers = up_left | up_right | down_left | down_right
+        if not jumpers:
+            return []
+        opp = self.pieces[side ^ 1]
+        forward = UP if side == DARK else DOWN
+        captures = []
+        for bit in iter_bits(jumpers):
+            # The square the piece leaves is free for the rest of its chain
+            empty = VALID & ~(self.pieces[side] | opp) | bit
+            self._jumps(bit, bit, bit & self.kings, forward, opp, empty, 0, captures)
+        if len(captures) > 1:
+            # A king can go round the same pieces either way: one move
+            captures = list(dict.fromkeys(captures))
+            captures.sort(key=lambda move: move[2].bit_count(), reverse=True)
+        return captures
+
+    def captured_total(self, side):
+        """
+        Number of pieces taken summed over every capture move of ``side``. When
+        no jump can go on from where it lands (checked on shift masks, which
+        can only overstate it) every capture is a single jump and the jumps
+        are counted straight from the masks.
+        """
+        up_left, up_right, down_left, down_right = self._single_jumps(side)
+        if not (up_left | up_right | down_left | down_right):
+            return 0
+        opp = self.pieces[side ^ 1]
+        kings = self.kings
+        empty = VALID & ~(self.pieces[side] | opp)
+        up_chain = (((empty << 5) & opp) << 5) | (((empty << 4) & opp) << 4)
+        down_chain = (((empty >> 4) & opp) >> 4) | (((empty >> 5) & opp) >> 5)
+        forward_chain = up_chain if side == DARK else down_chain
+        men_landings = ((up_left & ~kings) >> 10 | (up_right & ~kings) >> 8
+                        | (down_left & ~kings) << 8 | (down_right & ~kings) << 10)
+        king_landings = ((up_left & kings) >> 10 | (up_right & kings) >> 8
+                         | (down_left & kings) << 8 | (down_right & kings) << 10)
+        if men_landings & forward_chain & ~PROMOTION or king_landings & (up_chain | down_chain):
+            return sum(captured.bit_count() for _, _, captured in self.captures(side))
+        return (up_left.bit_count() + up_right.bit_count()
+                + down_left.bit_count() + down_right.bit_count())
+
+    def jump_path(self, move):
+        """Squares ``move`` lands on in turn, its final square included"""
+        frm, to, captured = move
+
+        def walk(bit, left):
+            if not left:
+                return [] if bit == to else None
+            for direction in ALL_DIRECTIONS:
+                over = shift(bit, direction) & left
+                landing = shift(over, direction) & VALID
+                if landing:
+                    rest = walk(landing, left ^ over)
+                    if rest is not None:
+                        return [landing] + rest
+            return None
+
+        return (walk(frm, captured) if captured else None) or [to]
+
+    def moves(self, side=None):
+        """
+        All legal moves of ``side`` (default: side to move). Capturing is
+        compulsory: when any capture exists only the captures are returned,
+        longest chains first; otherwise the quiet moves in board order.
+        """
+        if side is None:
+            side = self.turn
+        moves = self.captures(side)
+        if moves:
+            return moves
+        up, down = self._movers(side)
+        empty = VALID & ~(self.pieces[DARK] | self.pieces[LIGHT])
+        up_left = (empty << 5) & up
+        up_right = (empty << 4) & up
+        down_left = (empty >> 4) & down
+        down_right = (empty >> 5) & down
+        for bit in iter_bits(up_left | up_right | down_left | down_right):
+            if bit & up_left:
+                moves.append((bit, bit >> 5, 0))
+            if bit & up_right:
+                moves.append((bit, bit >> 4, 0))
+            if bit & down_left:
+                moves.append((bit, bit << 4, 0))
+            if bit & down_right:
+                moves.append((bit, bit << 5, 0))
+        return moves
+
+    def apply(self, move):
+        """Play ``move`` for the side to move; returns the data needed by restore"""
+        saved = (self.pieces[DARK], self.pieces[LIGHT], self.kings, self.turn, self.hash, self.score)
+        self._play(move)
+        return saved
+
+    def make_move(self, move):
+        """
+        Play ``move`` like apply, but push the undo record onto the position's
+        own preallocated stack (UNDO_RECORD ints per ply) instead of returning
+        it, so a search allocates nothing per node. unmake_move takes it back.
+        """
+        undo = self.undo
+        if undo is None:
+            undo = self.undo = [0] * (UNDO_RECORD * UNDO_PLIES)
+        top = self.undo_top
+        if top == len(undo):
+            undo.extend([0] * (UNDO_RECORD * UNDO_PLIES))
+        undo[top] = self.pieces[DARK]
+        undo[top + 1] = self.pieces[LIGHT]
+        undo[top + 2] = self.kings
+        undo[top + 3] = self.hash
+        undo[top + 4] = self.score
+        self.undo_top = top + UNDO_RECORD
+        self._play(move)
+
+    def _play(self, move):
+        """The board, hash and score update shared by apply and make_move"""
+        frm, to, captured = move
+        side = self.turn
+        pieces = self.pieces
+        kings = self.kings
+        key = self.hash
+        score = self.score
+        # A king's chain can go round and end where it started: nothing moves
+        if frm != to:
+            keys = PIECE_KEYS[side]
+            scores = SQUARE_SCORES[side]
+            pieces[side] ^= frm | to
+            if kings & frm:
+                kings ^= frm | to
+                key ^= keys[1][frm] ^ keys[1][to]
+                score += scores[1][to] - scores[1][frm]
+            elif to & PROMOTION:
+                kings |= to
+                key ^= keys[0][frm] ^ keys[1][to]
+                score += scores[1][to] - scores[0][frm]
+            else:
+                key ^= keys[0][frm] ^ keys[0][to]
+                score += scores[0][to] - scores[0][frm]
+        if captured:
+            pieces[side ^ 1] &= ~captured
+            opp_keys = PIECE_KEYS[side ^ 1]
+            opp_scores = SQUARE_SCORES[side ^ 1]
+            while captured:
+                bit = captured & -captured
+                if kings & bit:
+                    key ^= opp_keys[1][bit]
+                    score -= opp_scores[1][bit]
+                else:
+                    key ^= opp_keys[0][bit]
+                    score -= opp_scores[0][bit]
+                captured ^= bit
+            kings &= ~move[2]
+        self.kings = kings
+        self.hash = key ^ SIDE_KEY
+        self.score = score
+        self.turn = side ^ 1
+
+    def unmake_move(self):
+        """Take back the last move played with make_move"""
+        top = self.undo_top - UNDO_RECORD
+        undo = self.undo
+        pieces = self.pieces
+        pieces[DARK] = undo[top]
+        pieces[LIGHT] = undo[top + 1]
+        self.kings = undo[top + 2]
+        self.hash = undo[top + 3]
+        self.score = undo[top + 4]
+        self.turn ^= 1
+        self.undo_top = top
+
+    def restore(self, saved):
+        self.pieces[DARK], self.pieces[LIGHT], self.kings, self.turn, self.hash, self.score = saved
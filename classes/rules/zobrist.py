@@ -0,0 +1,39 @@
+import random
+
+# Zobrist keys for the 35-bit board layout (ghost bits get keys too, they are
+# simply never used).  The seed is fixed so that hashes are stable between
+# runs and processes: opening books and shared tables store them on disk.
+SEED = 0x5EED_C4EC
+BITS = 35
+
+_rng = random.Random(SEED)
+
+# PIECE_KEYS[side][is_king] maps a single-bit square mask to its 64-bit key
+PIECE_KEYS = tuple(
+    tuple({1 << bit: _rng.getrandbits(64) for bit in range(BITS)} for _ in range(2))
+    for _ in range(2)
+)
+# XORed in when the light side is to move
+SIDE_KEY = _rng.getrandbits(64)
+
+
+def piece_key(side, king, bit):
+    return PIECE_KEYS[side][1 if king else 0][bit]
+
+
+def mask_keys(side, king, mask):
+    """XOR of the keys of every square in ``mask`` for one kind of piece"""
+    keys = PIECE_KEYS[side][1 if king else 0]
+    key = 0
+    while mask:
+        bit = mask & -mask
+        key ^= keys[bit]
+        mask ^= bit
+    return key
+
+
+def full_hash(dark, light, kings, turn):
+    """Hash computed from scratch; positions keep theirs up to date incrementally"""
+    key = (mask_keys(0, False, dark & ~kings) ^ mask_keys(0, True, dark & kings)
+           ^ mask_keys(1, False, light & ~kings) ^ mask_keys(1, True, light & kings))
+    return key ^ SIDE_KEY if turn else key
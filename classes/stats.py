@@ -0,0 +1,73 @@
+import time
+
+
+class SearchStats:
+    """
+    Counters of one search, collected when ``AIPlayer.collect_stats`` is set.
+
+    minimax only touches them behind an ``is not None`` check, so a search
+    without them costs one comparison per node. Evaluation and move
+    generation go through ``evaluate`` and ``moves`` to be counted and timed.
+    """
+
+    COUNTERS = ("nodes", "leaves", "qnodes", "qlimit_hits", "eval_calls", "eval_time",
+                "movegen_calls", "movegen_time", "tt_probes", "tt_hits", "tablebase_hits")
+
+    def __init__(self):
+        self.nodes = 0
+        self.leaves = 0
+        # Quiescence nodes (part of ``nodes``) and leaves whose quiescence
+        # search ran out of nodes
+        self.qnodes = 0
+        self.qlimit_hits = 0
+        self.eval_calls = 0
+        self.eval_time = 0.0
+        self.movegen_calls = 0
+        self.movegen_time = 0.0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tablebase_hits = 0
+        # Beta cutoffs by index of the move that caused them, 0 being the first
+        self.cutoffs = []
+        # Deepest ply below the root reached by the search, and below a leaf
+        # reached by quiescence
+        self.max_depth = 0
+        self.max_qdepth = 0
+        self.pv = []
+
+    def evaluate(self, evaluate, position):
+        start = time.perf_counter()
+        score = evaluate(position)
+        self.eval_time += time.perf_counter() - start
+        self.eval_calls += 1
+        return score
+
+    def moves(self, position):
+        start = time.perf_counter()
+        moves = position.moves()
+        self.movegen_time += time.perf_counter() - start
+        self.movegen_calls += 1
+        return moves
+
+    def cutoff(self, index):
+        if index >= len(self.cutoffs):
+            self.cutoffs.extend([0] * (index + 1 - len(self.cutoffs)))
+        self.cutoffs[index] += 1
+
+    def merge(self, other):
+        """Add the counters of ``other`` (an ``as_dict``), e.g. from a pool worker"""
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + other[name])
+        for index, count in enumerate(other["cutoffs"]):
+            if index == len(self.cutoffs):
+                self.cutoffs.append(0)
+            self.cutoffs[index] += count
+        self.max_depth = max(self.max_depth, other["max_depth"])
+        self.max_qdepth = max(self.max_qdepth, other["max_qdepth"])
+
+    def as_dict(self):
+        """Plain picklable copy, as found in ``last_search["stats"]``"""
+        stats = {name: getattr(self, name) for name in self.COUNTERS}
+        stats.update(cutoffs=list(self.cutoffs), max_depth=self.max_depth, max_qdepth=self.max_qdepth,
+                     pv=list(self.pv))
+        return stats
@@ -0,0 +1,146 @@
+import itertools
+import mmap
+import os
+
+from .rules import DARK, LIGHT, ROW_MASKS, VALID, iter_bits
+
+# Endgame tables built by tools/build_tablebase.py, one file per material
+# signature (dark men, dark kings, light men, light kings) named after its
+# four counts, e.g. "0111.tb". A file is MAGIC followed by one byte per
+# position index: the result for the side to move in the low two bits and
+# the distance to the end of the game in plies (capped) above them.
+MAGIC = b"CKTB1\n\0\0"
+TABLEBASE_DIR = "assets/tablebase"
+
+DRAW, WIN, LOSS, INVALID = 0, 1, 2, 3
+MAX_DISTANCE = 63
+
+# Squares a piece may stand on: men never rest on the row they promote on
+KING_SQUARES = list(iter_bits(VALID))
+MAN_SQUARES = (list(iter_bits(VALID & ~ROW_MASKS[0])), list(iter_bits(VALID & ~ROW_MASKS[-1])))
+
+_groups = {}
+
+
+def group(side, king, count):
+    """
+    ``(masks, ranks)`` of one group of pieces: every placement of ``count``
+    men or kings of ``side`` as a mask, and the reverse mapping to its rank.
+    """
+    key = (side, king, count)
+    if key not in _groups:
+        squares = KING_SQUARES if king else MAN_SQUARES[side]
+        masks = [sum(combo) for combo in itertools.combinations(squares, count)]
+        _groups[key] = (masks, {mask: rank for rank, mask in enumerate(masks)})
+    return _groups[key]
+
+
+def signature(position):
+    kings = position.kings
+    dark, light = position.pieces
+    return ((dark & ~kings).bit_count(), (dark & kings).bit_count(),
+            (light & ~kings).bit_count(), (light & kings).bit_count())
+
+
+class Table:
+    """
+    Position ranking of one material signature: the four groups of pieces
+    are ranked separately and combined with the side to move into an index.
+    Placements where two groups overlap get an index too, marked INVALID.
+    """
+
+    def __init__(self, sig):
+        self.signature = sig
+        self.groups = [group(DARK, False, sig[0]), group(DARK, True, sig[1]),
+                       group(LIGHT, False, sig[2]), group(LIGHT, True, sig[3])]
+        self.size = 2
+        for masks, _ in self.groups:
+            self.size *= len(masks)
+
+    def index(self, dark, light, kings, turn):
+        (_, dm), (_, dk), (_, lm), (_, lk) = self.groups
+        index = dm[dark & ~kings]
+        index = index * len(dk) + dk[dark & kings]
+        index = index * len(lm) + lm[light & ~kings]
+        index = index * len(lk) + lk[light & kings]
+        return index * 2 + turn
+
+    def position(self, index):
+        """``(dark, light, kings, turn)`` of ``index``, or None for an INVALID one"""
+        index, turn = divmod(index, 2)
+        masks = []
+        for group_masks, _ in reversed(self.groups):
+            index, rank = divmod(index, len(group_masks))
+            masks.append(group_masks[rank])
+        lk, lm, dk, dm = masks
+        if (dm | dk | lm | lk).bit_count() != sum(self.signature):
+            return None
+        return dm | dk, lm | lk, dk | lk, turn
+
+
+def filename(sig):
+    return "".join(str(count) for count in sig) + ".tb"
+
+
+class Tablebase:
+    """
+    Probe for the tables in ``directory``. Files are memory-mapped the first
+    time a position of their signature is probed; ``pieces`` is the largest
+    piece count with tables, so callers can skip the probe on a bit count.
+    """
+
+    def __init__(self, directory=TABLEBASE_DIR):
+        self.directory = directory
+        self.tables = {}
+        self.pieces = 0
+        for name in os.listdir(directory):
+            if name.endswith(".tb") and len(name) == 7 and name[:4].isdigit():
+                self.pieces = max(self.pieces, sum(int(count) for count in name[:4]))
+        self.hits = self.misses = 0
+
+    def _table(self, sig):
+        if sig not in self.tables:
+            path = os.path.join(self.directory, filename(sig))
+            table = None
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                table = Table(sig)
+                if data[:len(MAGIC)] != MAGIC or len(data) != len(MAGIC) + table.size:
+                    raise ValueError(f"{path} is not a tablebase file for {sig}")
+                table.data = data
+            self.tables[sig] = table
+        return self.tables[sig]
+
+    def probe(self, position):
+        """
+        ``(result, distance)`` for the side to move, or None without a table.
+        A side left without pieces has lost, table or not.
+        """
+        dark, light = position.pieces
+        if not dark or not light:
+            return (LOSS, 0) if not position.pieces[position.turn] else (WIN, 0)
+        if (dark | light).bit_count() > self.pieces:
+            return None
+        table = self._table(signature(position))
+        if table is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        value = table.data[len(MAGIC) + table.index(dark, light, position.kings, position.turn)]
+        return value & 3, value >> 2
+
+    def close(self):
+        for table in self.tables.values():
+            if table is not None:
+                table.data.close()
+        self.tables = {}
+
+
+def load_tablebase(directory=TABLEBASE_DIR):
+    """The tables in ``directory``, or None when there are none"""
+    try:
+        tablebase = Tablebase(directory)
+    except OSError:
+        return None
+    return tablebase if tablebase.pieces else None
@@ -0,0 +1,15 @@
+import functools
+
+from .assets import font as get_font
+
+# Rendered text surfaces kept by render()
+TEXT_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render(font, text, color):
+    """
+    Antialiased rendering of ``text``, kept for the next frames that draw the
+    same (font, text, color). The surface is shared: blit it, never draw on it.
+    """
+    return font.render(text, True, color)
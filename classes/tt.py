@@ -0,0 +1,159 @@
+from array import array
+from multiprocessing import shared_memory
+
+from .rules import pack_move, unpack_move
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Entries are three 64-bit words: key ^ data ^ move, data, move (packed
+# with pack_move); data has score + SCORE_BIAS in the low 32 bits, then
+# depth, bound and age bytes
+SLOT_WORDS = 3
+SCORE_BIAS = 1 << 31
+
+POLICIES = ("depth", "always")
+
+
+def table_size(megabytes):
+    """Largest power-of-two slot count whose words, age included, fit in ``megabytes``"""
+    size = 1
+    while (1 + size * 2 * SLOT_WORDS) * 8 <= megabytes * 1024 * 1024:
+        size *= 2
+    return size
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of search results keyed by the Zobrist hash of a position.
+
+    Results come back as ``(depth, score, bound, move)`` tuples. They are kept
+    packed in a flat array of 64-bit words: the search age, then one slot of
+    SLOT_WORDS words per entry (one per ``key & mask``). The array is the whole
+    cost of the table, so it stays within ``megabytes`` however long the game
+    lasts. With the "depth" policy a slot keeps the deeper of two results
+    unless it was written by an earlier search; "always" replaces on every
+    store.
+    """
+
+    def __init__(self, megabytes=16, policy="depth"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown replacement policy: {policy}")
+        self.policy = policy
+        self.size = table_size(megabytes)
+        self.mask = self.size - 1
+        self.clear()
+
+    @property
+    def age(self):
+        return self.words[0]
+
+    def new_search(self):
+        """Mark entries written so far as old, so the depth policy lets them go"""
+        self.words[0] = self.words[0] + 1 & 0xFF
+
+    def clear(self):
+        self.words = array("Q", [0]) * (1 + self.size * SLOT_WORDS)
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def probe(self, key):
+        words = self.words
+        base = 1 + (key & self.mask) * SLOT_WORDS
+        data = words[base + 1]
+        move = words[base + 2]
+        if data and words[base] ^ data ^ move == key:
+            self.hits += 1
+            return (data >> 32 & 0xFF, (data & 0xFFFFFFFF) - SCORE_BIAS,
+                    data >> 40 & 0xFF, unpack_move(move))
+        if data:
+            self.collisions += 1
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        words = self.words
+        base = 1 + (key & self.mask) * SLOT_WORDS
+        age = words[0]
+        if self.policy == "depth":
+            data = words[base + 1]
+            if (data and words[base] ^ data ^ words[base + 2] != key
+                    and data >> 48 & 0xFF == age and data >> 32 & 0xFF > depth):
+                return
+        data = int(score) + SCORE_BIAS | depth << 32 | bound << 40 | age << 48
+        move = pack_move(move)
+        words[base + 1] = data
+        words[base + 2] = move
+        words[base] = key ^ data ^ move
+        self.stores += 1
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            "size": self.size,
+            "policy": self.policy,
+            "stores": self.stores,
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "filled": sum(self.words[1 + index * SLOT_WORDS + 1] != 0
+                          for index in range(self.size)) / self.size,
+        }
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    TranspositionTable kept in a multiprocessing.shared_memory block so that
+    several search processes share their results without pickling.
+
+    The block holds the same words as a TranspositionTable. Writes take no
+    lock; the first word of a slot is the XOR of the key with the two others,
+    so a slot torn by two processes writing at once no longer matches its key
+    and reads as a miss.
+    The process that creates the table owns the block and unlinks it in
+    ``close``, or when the table is collected unclosed; workers ``attach`` to
+    it by name. Hit and miss counters are per process.
+    """
+
+    def __init__(self, megabytes=16, policy="depth", name=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown replacement policy: {policy}")
+        self.policy = policy
+        self.owner = name is None
+        if self.owner:
+            size = table_size(megabytes)
+            self.shm = shared_memory.SharedMemory(create=True, size=(1 + size * SLOT_WORDS) * 8)
+        else:
+            # Spawned workers share the owner's resource tracker, which only
+            # unlinks the block if the owner never does
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.words = self.shm.buf.cast("Q")
+        self.size = (len(self.words) - 1) // SLOT_WORDS
+        self.mask = self.size - 1
+        if self.owner:
+            self.clear()
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    @classmethod
+    def attach(cls, name, policy="depth"):
+        return cls(policy=policy, name=name)
+
+    def clear(self):
+        """Empty the table for every process using it"""
+        self.shm.buf[:] = bytes(len(self.shm.buf))
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def close(self):
+        if self.shm is None:
+            return
+        self.words.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
+
+    def __del__(self):
+        # The view must go before the block: SharedMemory.__del__ cannot
+        # close it while exported pointers exist
+        if getattr(self, "shm", None) is not None:
+            self.close()
@@ -2,15 +2,16 @@ import pygame
 from classes.constants import WIDTH, HEIGHT, SQUARE_SIZE, PIECE_LIGHT, PIECE_DARK, ROWS, COLS
 from classes.game import Game
 from classes.menu import MainMenu, PauseMenu
-from classes.ai import AIPlayer
+from classes.engine import Engine
+from classes.assets import image, sound
+from classes.text import get_font, render
+from classes.loop import FrameLoop
 
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption('Checkers')
-
-# Initialisation du mixer pour le son
-pygame.mixer.init()
-# Chargement du fichier de son
-ERROR_SOUND = pygame.mixer.Sound('assets/error.mp3')  # Assure-toi que le fichier est au bon chemin
+# pygame est initialisé et la fenêtre et les sons sont créés dans main() : le
+# processus de l'IA réimporte ce module et ne doit ni initialiser pygame ni
+# ouvrir de fenêtre
+WIN = None
+ERROR_SOUND = None
 
 def get_row_col_from_mouse(pos):
     board_offset_x = (WIDTH - (COLS * SQUARE_SIZE)) // 2
@@ -24,19 +25,27 @@ def get_row_col_from_mouse(pos):
 
 def draw_text_with_background(text, font, text_color, background_color, surface, x, y, width, height):
     pygame.draw.rect(surface, background_color, (x, y, width, height), border_radius=15)
-    text_surface = font.render(text, True, text_color)
+    text_surface = render(font, text, text_color)
     text_rect = text_surface.get_rect(center=(x + width // 2, y + height // 2))
     surface.blit(text_surface, text_rect)
 
 def main():
+    global WIN, ERROR_SOUND
     pygame.init()
+    WIN = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption('Checkers')
+
+    # Initialisation du mixer pour le son
+    pygame.mixer.init()
+    # Chargement du fichier de son
+    ERROR_SOUND = sound('error.mp3')  # None si le son n'a pas pu être chargé
+
     # Charger l'image de fond pour le menu de pause
-    background = pygame.image.load("assets/background.jpg")
-    background = pygame.transform.scale(background, (WIDTH, HEIGHT))
+    background = image("background.jpg", (WIDTH, HEIGHT))
     
     run = True
-    clock = pygame.time.Clock()
-    font = pygame.font.Font("assets/ps2p.ttf", 48)
+    loop = FrameLoop()
+    font = get_font(48)
     main_menu = MainMenu(WIN)
     mode, player_difficulty, ai_difficulty, show_help = main_menu.run()  # Get help choice
     
@@ -51,7 +60,7 @@ def main():
     network = None
     
     if mode == "vsAI":
-        ai_player = AIPlayer(PIECE_LIGHT, ai_difficulty)
+        ai_player = Engine(PIECE_LIGHT, ai_difficulty)
         # In vsAI, player controls PIECE_DARK, so enable move sound
         game.enable_move_sound = True
     elif mode == "online":
@@ -79,7 +88,6 @@ def main():
                 game.black_score = message.get("black_score", game.black_score)
                 game.white_score = message.get("white_score", game.white_score)
                 print(f"[CLIENT] Updated scores: Black={game.black_score}, White={game.white_score}")
-                game.update()
             
             elif message["type"] == "game_started":
                 print(f"[CLIENT] Game started notification received in main")
@@ -106,14 +114,18 @@ def main():
     ai_move_time = 0
     
     while run:
-        clock.tick(60)
-        
         if mode == "vsAI" and game.turn == PIECE_LIGHT and not ai_thinking:
             ai_thinking = True
             ai_move_time = pygame.time.get_ticks()
+
+        # Sans animation ni coup de l'IA en attente, la boucle dort jusqu'au
+        # prochain événement ou à la prochaine seconde affichée par les chronos
+        events = loop.events(None if ai_thinking else game.idle_timeout())
         
-        if ai_thinking and pygame.time.get_ticks() - ai_move_time > 300:
-            ai_player.make_move(game)
+        # The search runs in the engine process, the loop keeps drawing meanwhile
+        if ai_thinking and not ai_player.searching and pygame.time.get_ticks() - ai_move_time > 300:
+            ai_player.start(game)
+        if ai_thinking and ai_player.poll(game):
             ai_thinking = False
 
         winner = game.winner()
@@ -122,6 +134,10 @@ def main():
             draw_text_with_background(winner_text, font, (255, 255, 255), (50, 50, 50), WIN, WIDTH // 4, 80, WIDTH // 2, 80)
             pygame.display.update()
             pygame.time.delay(3000)
+            if ai_player:
+                ai_player.close()
+                ai_player = None
+            ai_thinking = False
             main_menu = MainMenu(WIN)
             mode, player_difficulty, ai_difficulty, show_help = main_menu.run()  # Récupérer mode, player_difficulty, ai_difficulty, show_help
             if mode == "quit":
@@ -130,7 +146,7 @@ def main():
                 game = Game(WIN, player_difficulty, show_help)  # Passer player_difficulty et show_help à Game
                 # Let Game class handle show_valid_moves based on difficulty
                 if mode == "vsAI":
-                    ai_player = AIPlayer(PIECE_LIGHT, ai_difficulty)
+                    ai_player = Engine(PIECE_LIGHT, ai_difficulty)
                     game.enable_move_sound = True
                 elif mode == "online":
                     network = ai_difficulty
@@ -149,7 +165,6 @@ def main():
                             # Update scores
                             game.black_score = message.get("black_score", game.black_score)
                             game.white_score = message.get("white_score", game.white_score)
-                            game.update()
                     
                     network.set_callback(handle_network_message)
                 else:
@@ -157,10 +172,7 @@ def main():
                     game.enable_move_sound = True
             continue
 
-        turn_text = f"Turn: {'Red' if game.turn == PIECE_LIGHT else 'Black'}"
-        draw_text_with_background(turn_text, font, (255, 255, 255), (50, 50, 50), WIN, WIDTH // 4, 10, WIDTH // 2, 60)
-        
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 run = False
                 if network:
@@ -169,6 +181,8 @@ def main():
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     game.toggle_pause()  # Toggle pause state
+                    if ai_player:
+                        ai_player.cancel()  # Relancée à la reprise
                     pause_menu = PauseMenu(WIN, background)
                     pause_result = pause_menu.run()
                     if pause_result == "quit":
@@ -178,6 +192,10 @@ def main():
                     elif pause_result == "main_menu":
                         if network:
                             network.disconnect()
+                        if ai_player:
+                            ai_player.close()
+                            ai_player = None
+                        ai_thinking = False
                         main_menu = MainMenu(WIN)
                         mode, player_difficulty, ai_difficulty, show_help = main_menu.run()
                         if mode == "quit":
@@ -186,7 +204,7 @@ def main():
                             game = Game(WIN, player_difficulty, show_help)
                             # Let Game class handle show_valid_moves based on difficulty
                             if mode == "vsAI":
-                                ai_player = AIPlayer(PIECE_LIGHT, ai_difficulty)
+                                ai_player = Engine(PIECE_LIGHT, ai_difficulty)
                                 game.enable_move_sound = True
                             elif mode == "online":
                                 network = ai_difficulty
@@ -205,7 +223,6 @@ def main():
                                         # Update scores
                                         game.black_score = message.get("black_score", game.black_score)
                                         game.white_score = message.get("white_score", game.white_score)
-                                        game.update()
                                 
                                 network.set_callback(handle_network_message)
                             else:
@@ -218,6 +235,11 @@ def main():
                 # Toggle valid moves display with 'V' key
                 elif event.key == pygame.K_v:
                     game.show_valid_moves = not game.show_valid_moves
+
+                # Statistiques de recherche de l'IA avec F3
+                elif event.key == pygame.K_F3 and ai_player:
+                    ai_player.collect_stats = not ai_player.collect_stats
+                    game.show_debug = ai_player.collect_stats
             
             if event.type == pygame.MOUSEBUTTONDOWN:
                 pos = pygame.mouse.get_pos()
@@ -225,6 +247,8 @@ def main():
                 # Check for pause button click
                 if game.is_pause_button_clicked(pos):
                     game.toggle_pause()  # Toggle pause state
+                    if ai_player:
+                        ai_player.cancel()  # Relancée à la reprise
                     pause_menu = PauseMenu(WIN, background)
                     pause_result = pause_menu.run()
                     if pause_result == "quit":
@@ -234,6 +258,10 @@ def main():
                     elif pause_result == "main_menu":
                         if network:
                             network.disconnect()
+                        if ai_player:
+                            ai_player.close()
+                            ai_player = None
+                        ai_thinking = False
                         main_menu = MainMenu(WIN)
                         mode, player_difficulty, ai_difficulty, show_help = main_menu.run()
                         if mode == "quit":
@@ -242,7 +270,7 @@ def main():
                             game = Game(WIN, player_difficulty, show_help)
                             # Let Game class handle show_valid_moves based on difficulty
                             if mode == "vsAI":
-                                ai_player = AIPlayer(PIECE_LIGHT, ai_difficulty)
+                                ai_player = Engine(PIECE_LIGHT, ai_difficulty)
                                 game.enable_move_sound = True
                             elif mode == "online":
                                 network = ai_difficulty
@@ -261,7 +289,6 @@ def main():
                                         # Update scores
                                         game.black_score = message.get("black_score", game.black_score)
                                         game.white_score = message.get("white_score", game.white_score)
-                                        game.update()
                                 
                                 network.set_callback(handle_network_message)
                             else:
@@ -289,15 +316,19 @@ def main():
                     row, col = get_row_col_from_mouse(pos)
                     if 0 <= row < 8 and 0 <= col < 8:
                         result = game.select(row, col)
-                        if result == "invalid_move" or result == "nothing_selected":
+                        if (result == "invalid_move" or result == "nothing_selected") and ERROR_SOUND:
                             ERROR_SOUND.play()
                         elif result == "move_made" and mode == "online":
                             # Send move to server
                             print(f"[CLIENT] Sending move. Turn changing to: {'Red' if game.turn == PIECE_LIGHT else 'Black'}")
                             network.send_move(game.board.get_board_state(), game.turn)
 
+        if game.show_debug and ai_player:
+            game.debug_stats = ai_player.stats
         game.update()
     
+    if ai_player:
+        ai_player.close()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,18 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from classes.constants import PIECE_DARK, PIECE_LIGHT
+from classes.game import Board
+from classes.rules import full_hash
+
+
+def test_to_position_hashes_side_to_move():
+    pygame.init()
+    board = Board(None)
+    for color in (PIECE_DARK, PIECE_LIGHT):
+        position = board.to_position(color)
+        assert position.hash == full_hash(*position.pieces, position.kings, position.turn)
@@ -0,0 +1,27 @@
+import tracemalloc
+
+from classes.rules import Position
+from classes.tt import EXACT, LOWER, TranspositionTable
+
+
+def test_probe_returns_stored_entry():
+    tt = TranspositionTable(1)
+    move = Position().moves()[0]
+    tt.store(12345, 7, -250, LOWER, move)
+    assert tt.probe(12345) == (7, -250, LOWER, move)
+    assert tt.probe(12345 + tt.size) is None
+
+
+def test_full_table_stays_under_cap():
+    megabytes = 4
+    tracemalloc.start()
+    try:
+        tt = TranspositionTable(megabytes)
+        move = Position().moves()[0]
+        for key in range(tt.size):
+            tt.store(key << 20 | key, 9, key % 1000, EXACT, move)
+        used = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert tt.stats()["filled"] == 1.0
+    assert used <= megabytes * 1024 * 1024
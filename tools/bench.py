@@ -0,0 +1,577 @@
+"""
+Benchmarks for the checkers engine.
+
+Run from the repository root:
+
+    python -m tools.bench movegen [--depth N] [--positions N] [--repeat N]
+    python -m tools.bench search [--depth N] [--positions N] [--repeat N]
+    python -m tools.bench tt [--depth N] [--positions N] [--megabytes N]
+    python -m tools.bench parallel [--depth N] [--positions N] [--workers N]
+    python -m tools.bench ordering [--depth N] [--positions N]
+    python -m tools.bench modes [--depth N] [--positions N]
+    python -m tools.bench render [--frames N] [--seed N]
+    python -m tools.bench difficulty [--repeat N] [--clock S] [-o PATH] [--baseline PATH] [--threshold F]
+
+"difficulty" plays the fixed CORPUS at each difficulty the way the game
+does (clock budget, tablebase, no book) and reports per position the
+latency, nodes, nodes per second, time to each depth, effective branching
+factor and how often the chosen move changed across iterations and runs.
+``-o`` writes the results as JSON; ``--baseline`` compares the mean latency
+of each difficulty with an earlier JSON run and exits non-zero when one is
+slower by more than ``--threshold``.
+
+"render" times Game.update on a headless SDL dummy display, repainting the
+whole window every frame (as before the dirty-rect renderer) and then with
+dirty rects, while idle, with a piece selected and its valid moves
+pulsing, and while a random game is played.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from classes.ai import AIPlayer, SEARCH_MODES
+from classes.parallel import ParallelAIPlayer
+from classes.rules import Position, DARK, LIGHT, COLORS
+from classes.constants import ROWS, COLS, PIECE_DARK, PIECE_LIGHT
+from tools.perft import REFERENCE
+
+DIFFICULTIES = ("easy", "medium", "hard")
+# Positions of the difficulty benchmark as (name, Position snapshot): the
+# perft middlegames and a few endgames, kept fixed so runs compare
+CORPUS = [(name, REFERENCE[name][0]) for name in ("opening", "thin", "light-to-move", "kings", "middlegame")] + [
+    ("endgame-1", (541073410, 134254592, 675319810, 0)),
+    ("endgame-2", (2101252, 4315938817, 4318040069, 0)),
+    ("endgame-3", (3152, 557088, 560240, 0)),
+    ("endgame-4", (4138, 1207967744, 1207971882, 0)),
+]
+
+
+def sample_positions(count, seed=2024):
+    """Fixed set of positions reached by seeded random playouts from the start"""
+    rng = random.Random(seed)
+    positions = [Position()]
+    while len(positions) < count:
+        position = Position()
+        for _ in range(rng.randrange(6, 40)):
+            moves = position.moves()
+            if not moves or position.winner() is not None:
+                break
+            position.apply(rng.choice(moves))
+        if position.moves():
+            positions.append(position)
+    return positions
+
+
+def engine_walk(position, depth):
+    if depth == 0:
+        return 1
+    nodes = 0
+    for move in position.moves():
+        saved = position.apply(move)
+        nodes += engine_walk(position, depth - 1)
+        position.restore(saved)
+    return nodes
+
+
+def legacy_walk(board, color, depth):
+    """
+    Same tree walk over the original list-of-lists Board, undoing moves the
+    way the original AI did. That Board keeps the original rules (optional
+    captures, a chain played one jump at a time), so its trees are not the
+    engine's and the two walks count their nodes apart.
+    """
+    if depth == 0:
+        return 1
+    other = COLORS[LIGHT] if color == COLORS[DARK] else COLORS[DARK]
+    nodes = 0
+    for piece in board.get_all_pieces(color):
+        for (row, col), skipped in board.get_valid_moves(piece).items():
+            counters = (board.red_left, board.white_left, board.red_kings, board.white_kings)
+            old_row, old_col, was_king = piece.row, piece.col, piece.king
+            board.move(piece, row, col)
+            board.remove(skipped)
+            nodes += legacy_walk(board, other, depth - 1)
+            board.move(piece, old_row, old_col)
+            piece.king = was_king
+            for s in skipped:
+                board.board[s.row][s.col] = s
+            board.red_left, board.white_left, board.red_kings, board.white_kings = counters
+    return nodes
+
+
+class LegacySearch:
+    """The original AIPlayer evaluation and minimax over the list-of-lists Board"""
+
+    def __init__(self, color):
+        self.color = color
+        self.nodes = 0
+
+    def evaluate_board(self, board):
+        score = 0
+        capture_opportunities = 0
+        for row in range(ROWS):
+            for col in range(COLS):
+                piece = board.get_piece(row, col)
+                if piece == 0:
+                    continue
+                mod = 1 if piece.color == self.color else -1
+                score += mod * 10
+                if piece.king:
+                    score += mod * 30
+                if row in (3, 4) and col in (3, 4):
+                    score += mod * 5
+                if col in (0, 7):
+                    score += mod * 3
+                if (piece.color == PIECE_DARK and row == 0) or (piece.color == PIECE_LIGHT and row == 7):
+                    score += mod * 10
+                if piece.color == self.color:
+                    for skipped in board.get_valid_moves(piece).values():
+                        if skipped:
+                            capture_opportunities += len(skipped) * 15
+        return score + capture_opportunities
+
+    def get_all_moves(self, board, color):
+        valid_moves = []
+        for row in range(ROWS):
+            for col in range(COLS):
+                piece = board.get_piece(row, col)
+                if piece != 0 and piece.color == color:
+                    for move, skipped in board.get_valid_moves(piece).items():
+                        valid_moves.append(((row, col), move, skipped))
+        valid_moves.sort(key=lambda x: len(x[2]), reverse=True)
+        return valid_moves
+
+    def minimax(self, board, depth, alpha, beta, maximizing):
+        self.nodes += 1
+        if depth == 0 or board.winner() is not None:
+            return self.evaluate_board(board), None
+        color = self.color if maximizing else (PIECE_LIGHT if self.color == PIECE_DARK else PIECE_DARK)
+        valid_moves = self.get_all_moves(board, color)
+        if not valid_moves:
+            return self.evaluate_board(board), None
+
+        best_score = float('-inf') if maximizing else float('inf')
+        best_move = None
+        for piece_pos, move, skipped in valid_moves:
+            piece = board.get_piece(*piece_pos)
+            counters = (board.red_left, board.white_left, board.red_kings, board.white_kings)
+            was_king = piece.king
+            board.move(piece, *move)
+            board.remove(skipped)
+            if move[0] == 0 or move[0] == ROWS - 1:
+                piece.make_king()
+            score, _ = self.minimax(board, depth - 1, alpha, beta, not maximizing)
+            board.move(piece, *piece_pos)
+            piece.king = was_king
+            for s in skipped:
+                board.board[s.row][s.col] = s
+            board.red_left, board.white_left, board.red_kings, board.white_kings = counters
+
+            if (score > best_score) if maximizing else (score < best_score):
+                best_score = score
+                best_move = (piece_pos, move)
+            if maximizing:
+                alpha = max(alpha, best_score)
+            else:
+                beta = min(beta, best_score)
+            if beta <= alpha:
+                break
+        return best_score, best_move
+
+
+def legacy_board(position):
+    # The original Board loads its textures and font, so it needs pygame up
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    pygame.init()
+    from classes.board import Board
+    board = Board()
+    board.set_board_state(position.to_state())
+    return board
+
+
+def best_of(repeat, func, *args):
+    """Result and best wall time of ``repeat`` calls, to damp scheduler noise"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def print_rows(rows):
+    """
+    Rows of (legacy nodes, legacy time, engine nodes, engine time). The
+    trees differ in size, so the speedup compares nodes per second.
+    """
+    print(f"{'#':>3} {'legacy':>9} {'legacy n/s':>12} {'engine':>9} {'engine n/s':>12} {'speedup':>8}")
+    for index, (legacy_nodes, legacy_time, nodes, engine_time) in enumerate(rows):
+        legacy_rate, rate = legacy_nodes / legacy_time, nodes / engine_time
+        print(f"{index:>3} {legacy_nodes:>9} {legacy_rate:>12.0f} {nodes:>9} {rate:>12.0f} "
+              f"{rate / legacy_rate:>7.1f}x")
+    legacy_nodes, legacy_time, nodes, engine_time = (sum(column) for column in zip(*rows))
+    legacy_rate, rate = legacy_nodes / legacy_time, nodes / engine_time
+    print(f"all {legacy_nodes:>9} {legacy_rate:>12.0f} {nodes:>9} {rate:>12.0f} {rate / legacy_rate:>7.1f}x")
+
+
+def bench_movegen(args):
+    rows = []
+    for position in sample_positions(args.positions):
+        board = legacy_board(position)
+        legacy_nodes, legacy_time = best_of(args.repeat, legacy_walk, board, COLORS[position.turn], args.depth)
+        nodes, engine_time = best_of(args.repeat, engine_walk, position.copy(), args.depth)
+        rows.append((legacy_nodes, legacy_time, nodes, engine_time))
+    print_rows(rows)
+
+
+def bench_search(args):
+    rows = []
+    for position in sample_positions(args.positions):
+        color = COLORS[position.turn]
+        legacy = LegacySearch(color)
+        board = legacy_board(position)
+        _, legacy_time = best_of(
+            args.repeat, legacy.minimax, board, args.depth, float('-inf'), float('inf'), True)
+
+        ai = AIPlayer(color, tt_megabytes=0, tablebase_dir=None)
+        # The original search scored its leaves as they stood, in board order,
+        # with full windows
+        ai.quiescence = ai.heuristics = False
+        ai.search_mode = "alphabeta"
+        _, engine_time = best_of(
+            args.repeat, ai.minimax, position.copy(), args.depth, float('-inf'), float('inf'))
+        # Both counters accumulate over the repeats
+        rows.append((legacy.nodes // args.repeat, legacy_time, ai.nodes // args.repeat, engine_time))
+    print_rows(rows)
+
+
+def bench_tt(args):
+    print(f"{'#':>3} {'no tt':>9} {'depth':>9} {'always':>9} {'reduction':>10} {'hit rate':>9} {'collisions':>11}")
+    totals = [0, 0, 0]
+    for index, position in enumerate(sample_positions(args.positions)):
+        color = COLORS[position.turn]
+        row = []
+        # Table statistics of the "depth" run, none with --megabytes 0
+        stats = None
+        for megabytes, policy in ((0, "depth"), (args.megabytes, "depth"), (args.megabytes, "always")):
+            ai = AIPlayer(color, tt_megabytes=megabytes, tt_policy=policy)
+            ai.depth = args.depth
+            ai.search(position.copy())
+            row.append(ai.nodes)
+            if policy == "depth" and megabytes:
+                stats = ai.tt.stats()
+        for column, nodes in enumerate(row):
+            totals[column] += nodes
+        if stats is None:
+            table = f"{'-':>9} {'-':>11}"
+        else:
+            table = f"{stats['hit_rate']:>9.1%} {stats['collisions']:>11}"
+        print(f"{index:>3} {row[0]:>9} {row[1]:>9} {row[2]:>9} {row[0] / row[1]:>9.1f}x {table}")
+    print(f"all {totals[0]:>9} {totals[1]:>9} {totals[2]:>9} {totals[0] / totals[1]:>9.1f}x")
+
+
+def bench_parallel(args):
+    counts = [1]
+    while counts[-1] * 2 <= args.workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.workers:
+        counts.append(args.workers)
+    positions = sample_positions(args.positions)
+
+    times = {}
+    reference = []
+    for workers in counts:
+        total = nodes = 0
+        for index, position in enumerate(positions):
+            color = COLORS[position.turn]
+            if workers == 1:
+                ai = AIPlayer(color)
+            else:
+                ai = ParallelAIPlayer(color, workers=workers)
+            try:
+                if workers > 1:
+                    # Start the pool outside the timing
+                    ai.depth = 1
+                    ai.search(position.copy())
+                ai.depth = args.depth
+                if ai.tt is not None:
+                    ai.tt.clear()
+                start = time.perf_counter()
+                move = ai.search(position.copy())
+                total += time.perf_counter() - start
+                nodes += ai.nodes
+                result = (ai.last_search["score"], move)
+            finally:
+                if workers > 1:
+                    ai.close()
+            if workers == 1:
+                reference.append(result)
+            elif result != reference[index]:
+                raise AssertionError(f"{workers} workers differ at position {index}: "
+                                     f"{reference[index]} != {result}")
+        times[workers] = (total, nodes)
+
+    print(f"time to depth {args.depth} on {len(positions)} positions ({os.cpu_count()} cpus)")
+    print(f"{'workers':>7} {'time':>8} {'nodes':>9} {'speedup':>8}")
+    for workers in counts:
+        total, nodes = times[workers]
+        print(f"{workers:>7} {total:>7.2f}s {nodes:>9} {times[1][0] / total:>7.2f}x")
+
+
+def bench_ordering(args):
+    print(f"{'#':>3} {'plain':>9} {'ordered':>9} {'reduction':>10} {'first':>7} {'first':>7}")
+    totals = [0, 0]
+    first = [[0, 0], [0, 0]]
+    for index, position in enumerate(sample_positions(args.positions)):
+        color = COLORS[position.turn]
+        row = []
+        for column, heuristics in enumerate((False, True)):
+            ai = AIPlayer(color, book_path=None)
+            ai.depth = args.depth
+            ai.heuristics = heuristics
+            ai.collect_stats = True
+            ai.search(position.copy())
+            cutoffs = ai.last_search["stats"]["cutoffs"]
+            row.append((ai.nodes, cutoffs[0] / sum(cutoffs) if cutoffs else 1.0))
+            totals[column] += ai.nodes
+            first[column][0] += cutoffs[0] if cutoffs else 0
+            first[column][1] += sum(cutoffs)
+        (plain, plain_first), (ordered, ordered_first) = row
+        print(f"{index:>3} {plain:>9} {ordered:>9} {plain / ordered:>9.2f}x {plain_first:>7.1%} {ordered_first:>7.1%}")
+    print(f"all {totals[0]:>9} {totals[1]:>9} {totals[0] / totals[1]:>9.2f}x "
+          f"{first[0][0] / first[0][1]:>7.1%} {first[1][0] / first[1][1]:>7.1%}")
+    print("first: beta cutoffs caused by the first move searched")
+
+
+def bench_modes(args):
+    positions = sample_positions(args.positions)
+    results = {}
+    for mode in SEARCH_MODES:
+        nodes = elapsed = 0
+        scores = []
+        for position in positions:
+            ai = AIPlayer(COLORS[position.turn], book_path=None)
+            ai.depth = args.depth
+            ai.search_mode = mode
+            ai.search(position.copy())
+            nodes += ai.nodes
+            elapsed += ai.last_search["elapsed"]
+            scores.append(ai.last_search["score"])
+        results[mode] = (nodes, elapsed, scores)
+
+    reference = results[SEARCH_MODES[0]]
+    print(f"depth {args.depth} on {len(positions)} positions")
+    print(f"{'mode':<10} {'nodes':>9} {'time':>8} {'reduction':>10}")
+    for mode, (nodes, elapsed, scores) in results.items():
+        if scores != reference[2]:
+            raise AssertionError(f"{mode} scores differ: {reference[2]} != {scores}")
+        print(f"{mode:<10} {nodes:>9} {elapsed:>7.2f}s {reference[0] / nodes:>9.2f}x")
+
+
+def render_frames(game, scenario, frames, rng):
+    """Per-frame times and updated fractions of the window of one scenario"""
+    import pygame
+    times = []
+    area = 0
+    window = game.win.get_width() * game.win.get_height()
+    game.update()
+    if scenario == "selected":
+        game.show_valid_moves = True
+        for (row, col), moves in game.get_valid_moves().items():
+            game.select(row, col)
+            break
+    for frame in range(frames):
+        if scenario == "playing" and frame % 10 == 0:
+            if game.winner() is not None:
+                game.reset()
+            choices = [(square, to) for square, moves in game.get_valid_moves().items() for to in moves]
+            (row, col), to = rng.choice(choices)
+            game.select(row, col)
+            game.select(*to)
+        start = time.perf_counter()
+        game.update()
+        times.append(time.perf_counter() - start)
+        area += sum(rect.width * rect.height for rect in game.renderer.last_rects)
+        # Pace the frames like the 60 FPS game loop, for the timers and pulses
+        pygame.time.wait(max(0, 16 - int(times[-1] * 1000)))
+    return times, area / (frames * window)
+
+
+def bench_render(args):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    pygame.init()
+    from classes.constants import WIDTH, HEIGHT
+    from classes.game import Game
+    win = pygame.display.set_mode((WIDTH, HEIGHT))
+    print(f"{pygame.display.get_driver()} display, {args.frames} frames per run")
+    print(f"{'scenario':<10} {'mode':<6} {'mean ms':>8} {'p95 ms':>8} {'updated':>8}")
+    for scenario in ("idle", "selected", "playing"):
+        for dirty in (False, True):
+            game = Game(win, "easy")
+            game.dirty_rects = dirty
+            times, area = render_frames(game, scenario, args.frames, random.Random(args.seed))
+            times.sort()
+            print(f"{scenario:<10} {'dirty' if dirty else 'full':<6} {sum(times) / len(times) * 1000:>8.2f} "
+                  f"{times[int(len(times) * 0.95)] * 1000:>8.2f} {area:>8.1%}")
+    print("updated: mean share of the window passed to display.update")
+
+
+def search_run(difficulty, snapshot, clock):
+    """One search of ``snapshot`` as the game would play it at ``difficulty``"""
+    position = Position(*snapshot)
+    ai = AIPlayer(COLORS[position.turn], difficulty, book_path=None)
+    move = ai.search(position, ai.time_budget(clock))
+    info = ai.last_search
+    iterations = info["iterations"]
+    # Nodes of each iteration alone; the counter runs over the whole search
+    nodes = [later[2] - earlier[2] for earlier, later in zip([(0, 0, 0, None)] + iterations, iterations)]
+    ratios = [b / a for a, b in zip(nodes, nodes[1:]) if a]
+    changes = sum(a[3] != b[3] for a, b in zip(iterations, iterations[1:]))
+    return {
+        "move": list(move) if move is not None else None,
+        "depth": info["depth"],
+        "latency": info["elapsed"],
+        "nodes": info["nodes"],
+        "nps": info["nodes"] / info["elapsed"] if info["elapsed"] else 0.0,
+        "time_to_depth": {depth: elapsed for depth, elapsed, _, _ in iterations},
+        "branching": math.exp(sum(map(math.log, ratios)) / len(ratios)) if ratios else None,
+        "move_changes": changes,
+    }
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def bench_difficulty(args):
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "clock": args.clock,
+        "repeat": args.repeat,
+        "difficulties": {},
+    }
+    print(f"{'level':<7} {'position':<14} {'depth':>5} {'latency':>8} {'nodes':>9} {'nodes/s':>9} "
+          f"{'ebf':>5} {'changes':>7} {'stable':>6}")
+    for difficulty in DIFFICULTIES:
+        rows = []
+        for name, snapshot in CORPUS:
+            runs = [search_run(difficulty, snapshot, args.clock) for _ in range(args.repeat)]
+            # The best run stands for the position, as in best_of
+            row = dict(min(runs, key=lambda run: run["latency"]), position=name)
+            row["latencies"] = [run["latency"] for run in runs]
+            row["stable"] = all(run["move"] == runs[0]["move"] for run in runs)
+            rows.append(row)
+            branching = f"{row['branching']:.2f}" if row["branching"] else "-"
+            print(f"{difficulty:<7} {name:<14} {row['depth']:>5} {row['latency']:>7.3f}s {row['nodes']:>9} "
+                  f"{row['nps']:>9.0f} {branching:>5} {row['move_changes']:>7} {'yes' if row['stable'] else 'no':>6}")
+        nodes = sum(row["nodes"] for row in rows)
+        latency = sum(row["latency"] for row in rows)
+        report["difficulties"][difficulty] = {
+            "summary": {
+                "mean_latency": latency / len(rows),
+                "max_latency": max(row["latency"] for row in rows),
+                "nodes": nodes,
+                "nps": nodes / latency if latency else 0.0,
+                "stable": sum(row["stable"] for row in rows) / len(rows),
+            },
+            "positions": rows,
+        }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"results written to {args.output}")
+    if args.baseline:
+        return compare_latency(report, args.baseline, args.threshold)
+    return 0
+
+
+def compare_latency(report, path, threshold):
+    """Print the mean latency of each difficulty against ``path``; 1 on any regression"""
+    with open(path) as f:
+        baseline = json.load(f)
+    print(f"against {baseline.get('commit') or path}:")
+    regressions = 0
+    for difficulty, results in report["difficulties"].items():
+        if difficulty not in baseline["difficulties"]:
+            continue
+        before = baseline["difficulties"][difficulty]["summary"]["mean_latency"]
+        after = results["summary"]["mean_latency"]
+        change = after / before - 1 if before else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        regressions += bool(flag)
+        print(f"{difficulty:<7} {before:>7.3f}s -> {after:>7.3f}s {change:>+7.1%}{flag}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Checkers engine benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    movegen = commands.add_parser("movegen", help="bitboard generator vs the original Board")
+    movegen.add_argument("--depth", type=int, default=4)
+    movegen.add_argument("--positions", type=int, default=8)
+    movegen.add_argument("--repeat", type=int, default=3)
+    movegen.set_defaults(func=bench_movegen)
+
+    search = commands.add_parser("search", help="AIPlayer.minimax vs the original list-of-lists search")
+    search.add_argument("--depth", type=int, default=5)
+    search.add_argument("--positions", type=int, default=8)
+    search.add_argument("--repeat", type=int, default=3)
+    search.set_defaults(func=bench_search)
+
+    tt = commands.add_parser("tt", help="node counts with and without the transposition table")
+    tt.add_argument("--depth", type=int, default=7)
+    tt.add_argument("--positions", type=int, default=8)
+    tt.add_argument("--megabytes", type=int, default=16)
+    tt.set_defaults(func=bench_tt)
+
+    parallel = commands.add_parser("parallel", help="time to depth of root splitting by worker count")
+    parallel.add_argument("--depth", type=int, default=9)
+    parallel.add_argument("--positions", type=int, default=4)
+    parallel.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parallel.set_defaults(func=bench_parallel)
+
+    ordering = commands.add_parser("ordering", help="node counts without and with killer/history ordering")
+    ordering.add_argument("--depth", type=int, default=7)
+    ordering.add_argument("--positions", type=int, default=8)
+    ordering.set_defaults(func=bench_ordering)
+
+    modes = commands.add_parser("modes", help="nodes to depth of each AIPlayer search mode")
+    modes.add_argument("--depth", type=int, default=8)
+    modes.add_argument("--positions", type=int, default=8)
+    modes.set_defaults(func=bench_modes)
+
+    render = commands.add_parser("render", help="Game.update frame times, full repaints vs dirty rects")
+    render.add_argument("--frames", type=int, default=300)
+    render.add_argument("--seed", type=int, default=2024)
+    render.set_defaults(func=bench_render)
+
+    difficulty = commands.add_parser("difficulty", help="AIPlayer at each difficulty on a fixed corpus, as JSON")
+    difficulty.add_argument("--repeat", type=int, default=3)
+    difficulty.add_argument("--clock", type=float, default=10 * 60, help="seconds left on the AI's clock")
+    difficulty.add_argument("-o", "--output")
+    difficulty.add_argument("--baseline", help="JSON of an earlier run to compare latency with")
+    difficulty.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 is 20%%")
+    difficulty.set_defaults(func=bench_difficulty)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
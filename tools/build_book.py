@@ -0,0 +1,142 @@
+"""
+Build and merge opening books for classes/book.py.
+
+Run from the repository root:
+
+    python -m tools.build_book selfplay [--games N] [--plies N] [--depth N] [--margin N] [--seed N] [-o PATH]
+    python -m tools.build_book import RECORDS... [--plies N] [-o PATH]
+    python -m tools.build_book merge BOOK... [-o PATH]
+
+"selfplay" plays seeded games from the start position, choosing at random
+among the moves that search within ``--margin`` of the best one. "import"
+reads game records, one game per line, with moves written as PDN square
+numbers ("11-15", "22x15" or "22x15x24"), as in tools/openings.pdn: square 1
+is in the back row of dark, the side that moves first, and squares are
+numbered 1 to 32 row by row from there. Every position reached in the first
+``--plies`` plies counts its move once; books written to the same path are
+merged into it.
+"""
+import argparse
+import os
+import random
+import sys
+
+from classes.ai import AIPlayer
+from classes.book import BOOK_PATH, read_book, write_book
+from classes.rules import COLORS, Position, bit_of, pack_move
+from classes.constants import ROWS, COLS
+
+# PDN square number -> bit mask. PDN counts from the back row of dark, the
+# side that moves first, which is row ROWS - 1 here: the board turned round
+PDN_SQUARES = [bit_of(row, col) for row in reversed(range(ROWS)) for col in reversed(range(COLS))
+               if (row + col) % 2 == 1]
+
+
+def add_move(weights, position, move):
+    key = (position.hash, pack_move(move))
+    weights[key] = weights.get(key, 0) + 1
+
+
+def selfplay_weights(games, plies, depth, margin, seed=2024):
+    rng = random.Random(seed)
+    players = [AIPlayer(color, book_path=None) for color in COLORS]
+    weights = {}
+    for game in range(games):
+        position = Position()
+        for _ in range(plies):
+            moves = position.moves()
+            if not moves or position.winner() is not None:
+                break
+            ai = players[position.turn]
+            scores = []
+            for move in moves:
+                saved = position.apply(move)
+                scores.append(-ai.minimax(position, depth - 1, float('-inf'), float('inf'))[0])
+                position.restore(saved)
+            best = max(scores)
+            move = rng.choice([move for move, score in zip(moves, scores) if score >= best - margin])
+            add_move(weights, position, move)
+            position.apply(move)
+        print(f"game {game + 1}/{games}: {len(weights)} entries", file=sys.stderr)
+    return weights
+
+
+def parse_move(position, token):
+    squares = [PDN_SQUARES[int(square) - 1] for square in token.replace("x", "-").split("-")]
+    for move in position.moves():
+        if move[0] == squares[0] and move[1] == squares[-1]:
+            # "22x15x24": the landing squares in between pick the chain
+            if len(squares) == 2 or position.jump_path(move) == squares[1:]:
+                return move
+    raise ValueError(f"illegal move {token}")
+
+
+def import_weights(paths, plies):
+    weights = {}
+    for path in paths:
+        with open(path) as f:
+            for number, line in enumerate(f, 1):
+                position = Position()
+                tokens = [token for token in line.split()
+                          if token[0].isdigit() and not token.endswith(".")
+                          and token not in ("1-0", "0-1", "1/2-1/2")]
+                try:
+                    for token in tokens[:plies]:
+                        move = parse_move(position, token)
+                        add_move(weights, position, move)
+                        position.apply(move)
+                except ValueError as e:
+                    print(f"{path}:{number}: {e}, rest of the game skipped", file=sys.stderr)
+    return weights
+
+
+def merge_weights(*books):
+    merged = {}
+    for weights in books:
+        for key, weight in weights.items():
+            merged[key] = merged.get(key, 0) + weight
+    return merged
+
+
+def save(weights, path, update=True):
+    if update and os.path.exists(path):
+        weights = merge_weights(read_book(path), weights)
+    write_book(path, weights)
+    positions = len({key for key, _ in weights})
+    print(f"{path}: {len(weights)} moves in {positions} positions")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and merge opening books")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    selfplay = commands.add_parser("selfplay", help="book from seeded AI self-play")
+    selfplay.add_argument("--games", type=int, default=100)
+    selfplay.add_argument("--plies", type=int, default=10)
+    selfplay.add_argument("--depth", type=int, default=5)
+    selfplay.add_argument("--margin", type=int, default=5)
+    selfplay.add_argument("--seed", type=int, default=2024)
+    selfplay.add_argument("-o", "--output", default=BOOK_PATH)
+
+    records = commands.add_parser("import", help="book from game records")
+    records.add_argument("records", nargs="+")
+    records.add_argument("--plies", type=int, default=10)
+    records.add_argument("-o", "--output", default=BOOK_PATH)
+
+    merge = commands.add_parser("merge", help="sum the weights of several books")
+    merge.add_argument("books", nargs="+")
+    merge.add_argument("-o", "--output", default=BOOK_PATH)
+
+    args = parser.parse_args(argv)
+    if args.command == "selfplay":
+        weights = selfplay_weights(args.games, args.plies, args.depth, args.margin, args.seed)
+    elif args.command == "import":
+        weights = import_weights(args.records, args.plies)
+    else:
+        weights = merge_weights(*(read_book(path) for path in args.books))
+    # A merge replaces its output, which may well be one of its inputs
+    save(weights, args.output, update=args.command != "merge")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
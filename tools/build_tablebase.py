@@ -0,0 +1,212 @@
+"""
+Retrograde endgame tablebase generator for classes/tablebase.py.
+
+Run from the repository root:
+
+    python -m tools.build_tablebase [--pieces N] [--workers N] [-o DIR]
+
+Every material signature with at most N pieces (and at least one per side)
+is solved exactly under the rules of classes/rules, counting a side with
+no legal move as lost. Promotions and captures always lead to signatures
+with fewer men or fewer pieces, so signatures are solved in waves of equal
+(pieces, men) counts; the signatures of a wave are independent and are
+solved in parallel, each reading the tables of earlier waves from DIR.
+Existing files are kept, so an interrupted build resumes where it stopped.
+"""
+import argparse
+import array
+import multiprocessing
+import os
+import sys
+import time
+
+from classes.rules import DARK, PROMOTION, VALID, Position, iter_bits
+from classes.tablebase import (
+    MAGIC, TABLEBASE_DIR, DRAW, WIN, LOSS, INVALID, MAX_DISTANCE,
+    Table, Tablebase, filename,
+)
+
+# Shifts that take a piece back to the square it came from: dark men step
+# towards row 0 (towards lower bits), light men towards row 7, kings both
+DARK_BACK = (5, 4)
+LIGHT_BACK = (-4, -5)
+KING_BACK = DARK_BACK + LIGHT_BACK
+# remaining[] value of a position that has a move to a draw or a win
+NEVER_LOST = 255
+
+
+def signatures(pieces):
+    sigs = []
+    for total in range(2, pieces + 1):
+        for dm in range(total + 1):
+            for dk in range(total + 1 - dm):
+                for lm in range(total + 1 - dm - dk):
+                    lk = total - dm - dk - lm
+                    if dm + dk and lm + lk:
+                        sigs.append((dm, dk, lm, lk))
+    return sigs
+
+
+def waves(pieces):
+    """Signatures grouped by (pieces, men), in the order they can be solved"""
+    grouped = {}
+    for sig in signatures(pieces):
+        grouped.setdefault((sum(sig), sig[0] + sig[2]), []).append(sig)
+    return [grouped[key] for key in sorted(grouped)]
+
+
+def back(mask, step):
+    return mask << step if step > 0 else mask >> -step
+
+
+def predecessors(table, dark, light, kings, turn):
+    """
+    Indexes of the positions of the same table that reach this one with a
+    quiet move that does not promote, i.e. every move that keeps the table.
+    Some may have a capture to play instead, the caller skips those.
+    """
+    mover = turn ^ 1
+    pieces = (dark, light)
+    own = pieces[mover]
+    empty = VALID & ~(dark | light)
+    for bit in iter_bits(own):
+        if bit & kings:
+            steps = KING_BACK
+        else:
+            steps = DARK_BACK if mover == DARK else LIGHT_BACK
+            if bit & PROMOTION:
+                continue
+        for step in steps:
+            origin = back(bit, step) & empty
+            if not origin:
+                continue
+            moved = own ^ bit ^ origin
+            new_kings = kings ^ bit ^ origin if bit & kings else kings
+            if mover == DARK:
+                yield table.index(moved, light, new_kings, mover)
+            else:
+                yield table.index(dark, moved, new_kings, mover)
+
+
+def solve(sig, directory):
+    """Solve one signature with the tables of earlier waves and write its file"""
+    path = os.path.join(directory, filename(sig))
+    if os.path.exists(path):
+        return sig, 0.0, None
+    start = time.perf_counter()
+    table = Table(sig)
+    solved = Tablebase(directory)
+    size = table.size
+
+    values = bytearray([INVALID]) * size
+    final = bytearray(size)
+    remaining = bytearray(size)
+    # Positions whose side to move has to capture, so has no quiet move back
+    # into the table
+    forced = bytearray(size)
+    # Longest distance of the moves known to win for the opponent
+    longest = array.array("H", bytes(2 * size))
+    buckets = {}
+
+    def push(distance, index, result):
+        buckets.setdefault(distance, []).append((index, result))
+
+    # Forward pass: outcomes of the moves that leave the table, and the
+    # number of moves that stay in it
+    for index in range(size):
+        placement = table.position(index)
+        if placement is None:
+            final[index] = 1
+            continue
+        position = Position(*placement, hash=0)
+        moves = position.moves()
+        if not moves:
+            push(0, index, LOSS)
+            continue
+        if moves[0][2]:
+            forced[index] = 1
+        inside = 0
+        win = None
+        never_lost = False
+        for move in moves:
+            saved = position.apply(move)
+            if not position.pieces[position.turn]:
+                result, distance = LOSS, 0
+            elif move[2] or (move[1] & PROMOTION and not move[0] & saved[2]):
+                result, distance = solved.probe(position)
+            else:
+                inside += 1
+                position.restore(saved)
+                continue
+            position.restore(saved)
+            if result == LOSS:
+                never_lost = True
+                if win is None or distance + 1 < win:
+                    win = distance + 1
+            elif result == DRAW:
+                never_lost = True
+            else:
+                longest[index] = max(longest[index], distance + 1)
+        if win is not None:
+            push(win, index, WIN)
+        remaining[index] = NEVER_LOST if never_lost else inside
+        if not inside and not never_lost:
+            push(longest[index], index, LOSS)
+
+    # Retrograde pass in order of distance: a lost position wins for every
+    # predecessor, and a position whose moves all win for the opponent is lost
+    distance = 0
+    while buckets:
+        for index, result in buckets.pop(distance, ()):
+            if final[index]:
+                continue
+            final[index] = 1
+            values[index] = result | min(distance, MAX_DISTANCE) << 2
+            for previous in predecessors(table, *table.position(index)):
+                if final[previous] or forced[previous]:
+                    continue
+                if result == LOSS:
+                    push(distance + 1, previous, WIN)
+                elif remaining[previous] != NEVER_LOST:
+                    remaining[previous] -= 1
+                    longest[previous] = max(longest[previous], distance + 1)
+                    if not remaining[previous]:
+                        push(longest[previous], previous, LOSS)
+        distance += 1
+
+    for index in range(size):
+        if not final[index]:
+            values[index] = DRAW
+    solved.close()
+
+    with open(path + ".tmp", "wb") as f:
+        f.write(MAGIC)
+        f.write(values)
+    os.replace(path + ".tmp", path)
+    counts = [0, 0, 0, 0]
+    for value in values:
+        counts[value & 3] += 1
+    return sig, time.perf_counter() - start, counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build endgame tablebases")
+    parser.add_argument("--pieces", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("-o", "--output", default=TABLEBASE_DIR)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output, exist_ok=True)
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(args.workers) as pool:
+        for wave in waves(args.pieces):
+            for sig, elapsed, counts in pool.starmap(solve, [(sig, args.output) for sig in wave]):
+                if counts is None:
+                    print(f"{filename(sig)}: exists")
+                else:
+                    print(f"{filename(sig)}: {counts[WIN]} wins, {counts[LOSS]} losses, "
+                          f"{counts[DRAW]} draws in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Perft: leaf counts of the move generator against stored known-good values.
+
+Run from the repository root:
+
+    python -m tools.perft [--depth N] [--position NAME] [--divide]
+
+Every reference position is walked to each depth up to N with
+Position.moves/make_move/unmake_move and the count of leaf nodes is
+compared with the stored one; nodes per second are reported for the
+deepest level. Any mismatch makes the exit status non-zero. ``--divide``
+prints the count below each root move of the deepest level, to find which
+move differs.
+
+The stored counts follow the rules as implemented in classes/rules
+(compulsory captures, a whole chain counting as one move); a change to the
+rules has to come with new counts here. The start position gives the
+published English draughts counts.
+"""
+import argparse
+import sys
+import time
+
+from classes.rules import Position, square_of
+
+# name -> (Position snapshot, leaf counts at depth 1, 2, ...)
+REFERENCE = {
+    "start": (
+        (34288435200, 7935, 0, 0),
+        [7, 49, 302, 1469, 7361, 36768, 179740]),
+    "opening": (
+        (3898646592, 17046034, 0, 0),
+        [4, 13, 27, 61, 189, 431, 2038]),
+    "thin": (
+        (6457434112, 88761, 65536, 0),
+        [1, 1, 2, 3, 5, 17, 62]),
+    "light-to-move": (
+        (29125248064, 4836307132, 4294967296, 1),
+        [1, 2, 2, 10, 44, 145, 644]),
+    "kings": (
+        (11997807622, 276847144, 268435462, 0),
+        [2, 3, 14, 36, 148, 724, 2698]),
+    "middlegame": (
+        (25267798016, 2151467, 0, 1),
+        [1, 5, 18, 65, 211, 666, 2363]),
+    # A dark king whose capture chain goes round four men back to its square
+    "king-loop": (
+        (3221749760, 50429969, 524289, 0),
+        [3, 9, 33, 151, 759, 3232, 16870]),
+}
+
+
+def perft(position, depth):
+    """Number of leaf nodes ``depth`` plies below ``position``"""
+    moves = position.moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        position.make_move(move)
+        nodes += perft(position, depth - 1)
+        position.unmake_move()
+    return nodes
+
+
+def divide(position, depth):
+    for move in position.moves():
+        position.make_move(move)
+        nodes = perft(position, depth - 1) if depth > 1 else 1
+        position.unmake_move()
+        frm, to, captured = move
+        print(f"  {square_of(frm)} -> {square_of(to)}{' x' if captured else ''}: {nodes}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move generator perft")
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--position", choices=sorted(REFERENCE))
+    parser.add_argument("--divide", action="store_true")
+    args = parser.parse_args(argv)
+
+    names = [args.position] if args.position else list(REFERENCE)
+    failures = total_nodes = 0
+    total_time = 0.0
+    print(f"{'position':<14} {'depth':>5} {'nodes':>10} {'expected':>10} {'nodes/s':>10}")
+    for name in names:
+        snapshot, expected = REFERENCE[name]
+        for depth in range(1, args.depth + 1):
+            position = Position(*snapshot)
+            start = time.perf_counter()
+            nodes = perft(position, depth)
+            elapsed = time.perf_counter() - start
+            stored = expected[depth - 1] if depth <= len(expected) else None
+            status = "" if stored is None or nodes == stored else "  MISMATCH"
+            failures += bool(status)
+            if depth == args.depth:
+                total_nodes += nodes
+                total_time += elapsed
+                print(f"{name:<14} {depth:>5} {nodes:>10} {stored if stored is not None else '-':>10} "
+                      f"{nodes / elapsed:>10.0f}{status}")
+                if args.divide:
+                    divide(position, depth)
+            elif status:
+                print(f"{name:<14} {depth:>5} {nodes:>10} {stored:>10}{status}")
+    print(f"{'all':<14} {args.depth:>5} {total_nodes:>10} {'':>10} {total_nodes / total_time:>10.0f}")
+    if failures:
+        print(f"{failures} mismatches")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())